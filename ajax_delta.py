@@ -0,0 +1,118 @@
+"""
+ASP.NET AJAX Delta Parser
+Parses UpdatePanel (MicrosoftAjax "Delta=true") responses using the length prefix
+of each segment instead of splitting on '|', so content containing '|' survives.
+
+Wire format, repeated until the end of the body:
+    length|type|id|content|
+where `length` counts UTF-16 code units of `content` (.NET string length).
+The parser walks the raw bytes with offsets and only decodes the segments the
+caller asks for, so a multi-hundred-KB __VIEWSTATE is copied once at most.
+"""
+
+# Delete-tables for bytes.translate: keep only UTF-8 continuation bytes, or only
+# lead bytes of 4-byte sequences (which take 2 UTF-16 code units)
+_KEEP_CONTINUATION = bytes(b for b in range(256) if not 0x80 <= b <= 0xBF)
+_KEEP_WIDE_LEAD = bytes(b for b in range(256) if not 0xF0 <= b <= 0xF7)
+
+
+def _skip_units(raw, pos, units):
+    """Byte offset reached after advancing `units` UTF-16 code units of UTF-8 text from `pos`."""
+    end = pos
+    size = len(raw)
+    while units > 0 and end < size:
+        stop = min(end + units, size)
+        window = raw[end:stop]
+        continuation = len(window.translate(None, _KEEP_CONTINUATION))
+        wide = len(window.translate(None, _KEEP_WIDE_LEAD))
+        units -= (stop - end) - continuation + wide
+        end = stop
+    # Finish a character whose lead byte fell at the end of the last window
+    while end < size and 0x80 <= raw[end] <= 0xBF:
+        end += 1
+    return end
+
+
+def _walk(raw, wanted):
+    """
+    Walk the segments of a delta body, yielding (type, id, start, end, content).
+    `content` is decoded only when wanted(type, id) is true, otherwise None.
+    ASCII content (ViewState, EventValidation) is decoded straight from a
+    memoryview, so its only copy is the resulting str.
+    Stops quietly at the first malformed segment (e.g. an HTML error page).
+    """
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    view = memoryview(raw)
+    size = len(raw)
+    pos = 0
+    while pos < size:
+        bar = raw.find(b"|", pos)
+        if bar == -1:
+            return
+        try:
+            length = int(raw[pos:bar])
+        except ValueError:
+            return
+        type_end = raw.find(b"|", bar + 1)
+        if type_end == -1:
+            return
+        id_end = raw.find(b"|", type_end + 1)
+        if id_end == -1:
+            return
+        ptype = raw[bar + 1:type_end].decode("ascii", errors="replace")
+        pid = raw[type_end + 1:id_end].decode("utf-8", errors="replace")
+        decode = wanted(ptype, pid)
+
+        start = id_end + 1
+        end = start + length
+        content = None
+        fast = False
+        if end <= size:
+            # One byte per code unit as long as the content is pure ASCII
+            if decode:
+                try:
+                    content = str(view[start:end], "ascii")
+                    fast = True
+                except UnicodeDecodeError:
+                    pass
+            else:
+                fast = raw[start:end].isascii()
+        if not fast:
+            end = _skip_units(raw, start, length)
+            if decode:
+                content = str(view[start:end], "utf-8", errors="replace")
+
+        if end >= size or raw[end] != 0x7C:  # '|'
+            return
+        yield ptype, pid, start, end, content
+        pos = end + 1
+
+
+def iter_segments(raw):
+    """
+    Yield (type, id, start, end) for every segment in a delta response.
+    `start`/`end` are byte offsets of the content inside `raw`; nothing is decoded.
+    """
+    for ptype, pid, start, end, _ in _walk(raw, lambda ptype, pid: False):
+        yield ptype, pid, start, end
+
+
+def parse_delta(raw, types=("hiddenField",), ids=None):
+    """
+    Decode the requested segments of a delta response.
+    types: segment types to decode (hiddenField only by default).
+    ids: optional collection of ids to restrict decoding to.
+    Returns {id: content} for hiddenField segments and {"panel_<id>": content}
+    for updatePanel segments, like PropertyScraperCore.parse_ajax_response.
+    """
+    result = {}
+    wanted = lambda ptype, pid: ptype in types and (ids is None or pid in ids)
+    for ptype, pid, _, _, content in _walk(raw, wanted):
+        if content is None:
+            continue
+        if ptype == "updatePanel":
+            result[f"panel_{pid}"] = content
+        else:
+            result[pid] = content
+    return result
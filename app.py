@@ -7,8 +7,15 @@ PropFind Uttarakhand v5.0 - Production Ready
 
 import streamlit as st
 import pandas as pd
-from scraper_core import PropertyScraperCore
-import time
+import numpy as np
+from records import RecordBatch, table_to_pandas
+from segment_store import SegmentStore
+from result_state import Clipboard, PageCache
+from jobs import FINISHED, JobManager, JobStore
+from districts import DISTRICTS, SRO_BY_DISTRICT
+from catalog import Catalog
+from sweep import ALL, format_eta
+import tempfile
 import urllib.parse
 
 # ============================================
@@ -60,47 +67,61 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ============================================
-# SESSION STATE
+# BACKGROUND JOBS
 # ============================================
-if 'scraped_data' not in st.session_state:
-    st.session_state.scraped_data = []
-if 'clipboard' not in st.session_state:
-    st.session_state.clipboard = []
+@st.cache_resource
+def get_jobs():
+    """
+    Worker processes running searches outside the script thread (capacity = worker count).
+    Workers share the on-disk result cache (past years kept, the current year re-crawled
+    once its 6 hour TTL expires) and crawl checkpoints, so a failed year resumes on the
+    next search.
+    """
+    return JobManager(
+        JobStore("propfind_jobs.sqlite3"), workers=2,
+        cache_path="propfind_cache.sqlite3", checkpoint_dir=".propfind_checkpoints",
+        catalog_path="propfind_catalog.json",
+    )
+
+@st.cache_resource
+def get_catalog():
+    """
+    SRO/year availability recorded by the workers' crawls (refresh with `python catalog.py`).
+    Fills the dropdowns; districts and SROs it does not know yet fall back to the built-in lists.
+    """
+    return Catalog("propfind_catalog.json")
+
+def new_job_view(job_id, district_id, sro_id, years_total):
+    """Session-side progress of a job: stream position and running counts."""
+    return {"id": job_id, "district": district_id, "sro": sro_id, "cursor": 0, "years_total": years_total,
+            "years_done": 0, "found": 0, "year_counts": {}, "errors": [], "message": "", "sweep": None}
+
+def cancel_job():
+    """Stop the session's running job, if any, and detach from it."""
+    if st.session_state.get("job"):
+        get_jobs().cancel(st.session_state.job["id"])
+        st.session_state.job = None
+        st.query_params.pop("job", None)
 
 # ============================================
-# DATA MAPPINGS
+# SESSION STATE
 # ============================================
-DISTRICTS = {
-    "01": "अल्मोड़ा (ALMORA)",
-    "02": "बागेश्वर (BAGESHWAR)",
-    "03": "चम्पावत (CHAMPAWAT)",
-    "04": "देहरादून (DEHRADUN)",
-    "05": "पौड़ी गढ़वाल (PAURI)",
-    "06": "चमोली (CHAMOLI)",
-    "07": "हरिद्वार (HARIDWAR)",
-    "08": "नैनीताल (NAINITAL)",
-    "09": "टिहरी गढ़वाल (TEHRI)",
-    "10": "पिथौरागढ़ (PITHORAGARH)",
-    "11": "रुद्रप्रयाग (RUDRAPRAYAG)",
-    "12": "उधम सिंह नगर (U S NAGAR)",
-    "13": "उत्तरकाशी (UTTARKASHI)",
-}
-
-SRO_BY_DISTRICT = {
-    "01": {"01": "अल्मोड़ा (ALMORA)", "02": "रानीखेत (RANIKHET)", "03": "द्वाराहाट (DWARAHAT)"},
-    "02": {"01": "बागेश्वर (BAGESHWAR)", "02": "कपकोट (KAPKOT)"},
-    "03": {"01": "चम्पावत (CHAMPAWAT)", "02": "लोहाघाट (LOHAGHAT)", "03": "टनकपुर (TANAKPUR)"},
-    "04": {"01": "देहरादून (DEHRADUN)", "02": "ऋषिकेश (RISHIKESH)", "03": "विकासनगर (VIKASNAGAR)", "04": "डोईवाला (DOIWALA)"},
-    "05": {"01": "पौड़ी (PAURI)", "02": "कोटद्वार (KOTDWAR)", "03": "श्रीनगर (SRINAGAR)"},
-    "06": {"01": "चमोली (CHAMOLI)", "02": "कर्णप्रयाग (KARNAPRAYAG)", "03": "जोशीमठ (JOSHIMATH)"},
-    "07": {"01": "हरिद्वार (HARIDWAR)", "02": "रुड़की (ROORKEE)", "03": "लक्सर (LAKSAR)"},
-    "08": {"01": "हल्द्वानी (HALDWANI)", "02": "नैनीताल (NAINITAL)", "03": "रामनगर (RAMNAGAR)", "04": "भीमताल (BHIMTAL)"},
-    "09": {"01": "टिहरी (TEHRI)", "02": "नरेंद्रनगर (NARENDRANAGAR)", "03": "घनसाली (GHANSALI)"},
-    "10": {"01": "पिथौरागढ़ (PITHORAGARH)", "02": "धारचूला (DHARCHULA)", "03": "बेरीनाग (BERINAG)"},
-    "11": {"01": "रुद्रप्रयाग (RUDRAPRAYAG)", "02": "ऊखीमठ (UKHIMATH)"},
-    "12": {"01": "बाजपुर (BAZPUR)", "02": "जसपुर (JASPUR)", "03": "काशीपुर (KASHIPUR)", "04": "खटीमा (KHATIMA)", "05": "सितारगंज (SITARGANJ)", "06": "रुद्रपुर (RUDRAPUR)"},
-    "13": {"01": "उत्तरकाशी (UTTARKASHI)", "02": "भटवाड़ी (BHATWARI)", "03": "पुरोला (PUROLA)"},
-}
+if 'results' not in st.session_state:
+    # Typed results pages spilled to Arrow segments on disk; the table pages through them
+    st.session_state.results = SegmentStore()
+if 'clipboard' not in st.session_state:
+    # Saved records keyed by _id (frame and CSV rebuilt only when it changes)
+    st.session_state.clipboard = Clipboard()
+if 'result_pages' not in st.session_state:
+    # Prepared DataFrames of recently shown result pages
+    st.session_state.result_pages = PageCache()
+if 'job' not in st.session_state:
+    # Reattach to a search still running after a browser reload (job id kept in the URL)
+    st.session_state.job = None
+    job_id = st.query_params.get("job")
+    params = get_jobs().store.params(job_id) if job_id else None
+    if params is not None:
+        st.session_state.job = new_job_view(job_id, params["district"], params["sro"], len(params["years"]))
 
 # ============================================
 # HEADER
@@ -111,24 +132,21 @@ st.caption("Property Search Engine | संपत्ति खोज इंज
 # Disclaimer
 st.warning("""
 **Disclaimer**: This tool is for **educational and research purposes only**. 
-No data is stored or collected. Not for commercial use.
+No personal data is collected; public search results are cached locally to spare the portal. Not for commercial use.
 """)
 
 # ============================================
 # CLIPBOARD
 # ============================================
-if st.session_state.clipboard:
-    with st.expander(f"Saved Records ({len(st.session_state.clipboard)})", expanded=False):
-        clip_df = pd.DataFrame(st.session_state.clipboard)
-        st.dataframe(clip_df, use_container_width=True, hide_index=True)
+clipboard = st.session_state.clipboard
+if len(clipboard):
+    with st.expander(f"Saved Records ({len(clipboard)})", expanded=False):
+        st.dataframe(clipboard.frame(), use_container_width=True, hide_index=True)
         col_a, col_b, _ = st.columns([1, 1, 4])
         with col_a:
-            csv_clip = clip_df.to_csv(index=False).encode('utf-8')
-            st.download_button("Download", csv_clip, "saved_records.csv", use_container_width=True)
+            st.download_button("Download", clipboard.csv, "saved_records.csv", use_container_width=True)
         with col_b:
-            if st.button("Clear", use_container_width=True):
-                st.session_state.clipboard = []
-                st.rerun()
+            st.button("Clear", use_container_width=True, on_click=clipboard.clear)
 
 st.divider()
 
@@ -154,14 +172,20 @@ with col1:
 with col2:
     district_id = st.selectbox(
         "District",
-        options=[""] + list(DISTRICTS.keys()),
-        format_func=lambda x: "-- Select District --" if x == "" else DISTRICTS[x],
+        options=["", ALL] + list(DISTRICTS.keys()),
+        format_func=lambda x: "-- Select District --" if x == "" else "All districts (sweep)" if x == ALL else DISTRICTS[x],
         index=0,
         key="district"
     )
 
 with col3:
-    sro_options = SRO_BY_DISTRICT.get(district_id, {}) if district_id else {}
+    # ALL sweeps every SRO of the district; all districts can only be swept
+    if district_id == ALL:
+        sro_options = {ALL: "All SROs (sweep)"}
+    elif district_id:
+        sro_options = {ALL: "All SROs (sweep)", **(get_catalog().sros(district_id) or SRO_BY_DISTRICT.get(district_id, {}))}
+    else:
+        sro_options = {}
     sro_id = st.selectbox(
         "SRO Office",
         options=[""] + list(sro_options.keys()) if sro_options else [""],
@@ -172,7 +196,8 @@ with col3:
     )
 
 with col4:
-    year_options = [None] + list(range(2026, 2008, -1))
+    known_years = get_catalog().years(district_id, sro_id) if district_id and sro_id and sro_id != ALL else None
+    year_options = [None] + ([int(y) for y in known_years] if known_years else list(range(2026, 2008, -1)))
     from_year = st.selectbox("From", options=year_options, format_func=lambda x: "-- Year --" if x is None else str(x), index=0, key="from_year")
 
 with col5:
@@ -182,22 +207,71 @@ with col6:
     search_btn = st.button(f"Search {search_type}s", type="primary", use_container_width=True, key="search_btn")
 
 # Row 3: Action buttons
-if st.session_state.scraped_data:
+if len(st.session_state.results):
     btn_col1, btn_col2, _ = st.columns([1, 1, 10])
     with btn_col1:
         if st.button("New Search", use_container_width=True):
-            st.session_state.scraped_data = []
+            cancel_job()
+            st.session_state.results.clear()
             st.rerun()
     with btn_col2:
         st.markdown('<div class="secondary-btn">', unsafe_allow_html=True)
         if st.button("Clear Results", use_container_width=True, key="clr_results"):
-            st.session_state.scraped_data = []
+            cancel_job()
+            st.session_state.results.clear()
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
 
 # ============================================
 # SEARCH EXECUTION
 # ============================================
+# Columns shown while results stream in (the final table adds Save)
+LIVE_COLS = ["Year", "RegDate", "RegNo", "Village", "Buyer", "Seller", "Amount", "MarketValue"]
+LIVE_ROWS = 200
+# Rows per page of the results table
+PAGE_ROWS = 500
+DISPLAY_COLS = ["Year", "RegDate", "RegNo", "Village", "SRO", "Buyer", "Seller", "Amount", "MarketValue", "_id"]
+
+def prepare_page(results, offset, row_ids=None):
+    """One page of the results table: display columns plus the Save column (unticked)."""
+    if row_ids is not None:
+        page_table = results.take(row_ids)
+    else:
+        page_table = results.read(offset, PAGE_ROWS)
+    df = table_to_pandas(page_table)
+    df = df[[c for c in DISPLAY_COLS if c in df.columns]]
+    df.insert(0, "Save", False)
+    return df
+
+def apply_saves(editor_key, df):
+    """
+    Editor callback: save / unsave the rows whose Save box differs from the clipboard.
+    edited_rows holds every edit made in this editor, so only the rows ticked are visited.
+    """
+    clipboard = st.session_state.clipboard
+    added, removed = [], []
+    for row, change in st.session_state[editor_key]["edited_rows"].items():
+        if "Save" not in change or change["Save"] == (df["_id"].iat[int(row)] in clipboard):
+            continue
+        if change["Save"]:
+            added.append(df.iloc[int(row)].drop("Save").to_dict())
+        else:
+            removed.append(df["_id"].iat[int(row)])
+    count = clipboard.add(added) if added else 0
+    clipboard.remove(removed)
+    if count:
+        st.toast(f"Added {count} records to clipboard!")
+
+def export_results(results, fmt, columns):
+    """Stream the whole result store into a temporary CSV/Parquet file for a download button."""
+    f = tempfile.TemporaryFile()
+    if fmt == "parquet":
+        results.write_parquet(f, columns)
+    else:
+        results.write_csv(f, columns)
+    f.seek(0)
+    return f
+
 years_list = []
 if from_year and to_year:
     years_list = [str(y) for y in range(min(from_year, to_year), max(from_year, to_year) + 1)]
@@ -210,97 +284,196 @@ if search_btn:
     elif not from_year or not to_year:
         st.warning("Please select year range")
     else:
-        st.session_state.scraped_data = []
-        
-        progress = st.progress(0, text=f"Searching {search_type.lower()}s...")
-        scraper = PropertyScraperCore(search_type=search_type.lower())
-        
-        for idx, year in enumerate(years_list):
-            progress.progress(idx / len(years_list), text=f"Searching {year}...")
-            
-            for update in scraper.scrape_year(district_id, sro_id, year, name_input):
-                if update["status"] == "data":
-                    for rec in update["data"]:
-                        rec["Year"] = year
-                        rec["_id"] = f"{year}_{rec.get('RegNo', '')}_{rec.get('RegDate', '')}"
-                    st.session_state.scraped_data.extend(update["data"])
-                elif update["status"] == "error":
-                    st.error(f"Error in {year}: {update['message']}")
-        
-        progress.progress(1.0, text="Search complete!")
-        time.sleep(0.5)
-        progress.empty()
-        
-        if st.session_state.scraped_data:
-            st.success(f"Found {len(st.session_state.scraped_data)} records")
-        else:
-            st.info("No records found for this search")
+        cancel_job()
+        st.session_state.results.clear()
+        job_id = get_jobs().submit(
+            search_type.lower(), district_id, sro_id, years_list, name_input, page_workers=4
+        )
+        st.session_state.job = new_job_view(job_id, district_id, sro_id, len(years_list))
+        st.query_params["job"] = job_id
+
+@st.fragment(run_every=1.0)
+def show_job_progress():
+    """Poll the job store and stream the job's new pages into the session and the live view."""
+    job = st.session_state.job
+    status, message, updates = get_jobs().store.poll(job["id"], job["cursor"])
+    for seq, update in updates:
+        job["cursor"] = seq
+        year = update.get("year")
+        if update["status"] == "data":
+            # Typed columnar batch per page (adds Year and _id). Ids carry district and SRO
+            # (sweep updates name theirs), like the batch_runner and sweep.py outputs
+            batch = RecordBatch.from_records(
+                update["data"], year, update.get("district", job["district"]), update.get("sro", job["sro"])
+            )
+            if len(batch):
+                st.session_state.results.append(batch)
+                job["found"] += len(batch)
+            job["year_counts"][year] = job["year_counts"].get(year, 0) + update["count"]
+        elif update["status"] == "error":
+            where = f"{update['district']}/{update['sro']} {year}" if "sro" in update else year
+            job["errors"].append(f"Error in {where}: {update['message']}")
+        elif update["status"] == "done":
+            job["years_done"] += 1
+        elif update["status"] == "info":
+            job["message"] = update["message"]
+        elif update["status"] == "progress":
+            # District sweep: per-SRO counts and ETAs (replaces the per-year progress)
+            job["sweep"] = update
+
+    if status in FINISHED or status is None:
+        # The full results table takes over from the live view
+        st.session_state.job = None
+        st.query_params.pop("job", None)
+        st.session_state.job_outcome = (status, message, job["found"], job["errors"])
+        st.rerun()
+
+    sweep = job["sweep"]
+    if sweep is not None:
+        st.progress(sweep["done"] / max(sweep["items"], 1),
+                    text=f"Sweeping... {sweep['done']}/{sweep['items']} SRO-years | ETA {format_eta(sweep['eta'])}")
+        st.caption(f"{job['found']} records so far | {job['message']}")
+        st.dataframe(
+            pd.DataFrame([
+                {"SRO": row["name"], "District": DISTRICTS.get(row["district"], row["district"]),
+                 "Years": f"{row['done']}/{row['items']}", "Running": row["running"],
+                 "Records": row["records"], "Errors": row["errors"], "ETA": format_eta(row["eta"])}
+                for row in sweep["sros"]
+            ]),
+            use_container_width=True, hide_index=True,
+        )
+    else:
+        years_done, years_total = job["years_done"], max(job["years_total"], 1)
+        st.progress(years_done / years_total, text=f"Searching... {years_done}/{years_total} years | {job['message']}")
+        st.caption(
+            f"{job['found']} records so far | "
+            + " | ".join(f"{y}: {c}" for y, c in sorted(job["year_counts"].items()))
+        )
+    for error in job["errors"]:
+        st.error(error)
+    results = st.session_state.results
+    if len(results):
+        # Latest rows only: the full table pages through the store once the job finishes
+        recent = table_to_pandas(results.read(max(len(results) - LIVE_ROWS, 0), LIVE_ROWS))
+        st.dataframe(recent[LIVE_COLS], use_container_width=True, hide_index=True, height=400)
+    if st.button("Stop search", key="stop_job"):
+        get_jobs().cancel(job["id"])
+
+if st.session_state.job:
+    show_job_progress()
+
+outcome = st.session_state.pop("job_outcome", None)
+if outcome is not None:
+    status, message, found, errors = outcome
+    for error in errors:
+        st.error(error)
+    if status == "failed":
+        st.error(f"Search failed: {message}")
+    elif status == "cancelled":
+        st.info(f"Search stopped after {found} records")
+    elif found:
+        st.success(f"Found {found} records")
+    else:
+        st.info("No records found for this search")
 
 # ============================================
 # RESULTS TABLE
 # ============================================
-if st.session_state.scraped_data:
+if len(st.session_state.results):
     st.divider()
+    results = st.session_state.results
     
     # Highlight controls
-    hl_col1, hl_col2, hl_col3 = st.columns([1.5, 3, 4])
+    hl_col1, hl_col2, hl_col3, hl_col4 = st.columns([1.5, 3, 4, 1.5])
     with hl_col1:
         enable_hl = st.checkbox("Highlight", value=False)
     with hl_col2:
         hl_text = st.text_input("Match text", placeholder="e.g., Ram, S/O...", label_visibility="collapsed", disabled=not enable_hl)
     with hl_col3:
         hl_field = st.radio("Field", ["All", "Buyer", "Seller", "Village"], horizontal=True, label_visibility="collapsed", disabled=not enable_hl)
+    with hl_col4:
+        hl_only = st.checkbox("Only matches", value=False, disabled=not enable_hl)
     
-    # Prepare DataFrame
-    df = pd.DataFrame(st.session_state.scraped_data)
-    display_cols = ["Year", "RegDate", "RegNo", "Village", "Buyer", "Seller", "Amount", "MarketValue", "_id"]
-    df = df[[c for c in display_cols if c in df.columns]]
+    # Highlight / filter via the store's search (row ids are positions in the store)
+    match_ids = None
+    if enable_hl and hl_text.strip():
+        match_ids = results.search(hl_text, hl_field)
+        st.caption(f"{len(match_ids)} matching records")
+    filtered = match_ids is not None and hl_only
     
-    # Add save checkbox column
-    df.insert(0, "Save", False)
+    # Only one page of rows is loaded from disk per rerun
+    total_rows = len(match_ids) if filtered else len(results)
+    page_count = max(1, -(-total_rows // PAGE_ROWS))
+    if st.session_state.get("result_page", 1) > page_count:
+        st.session_state.result_page = page_count
+    page_no = st.number_input(
+        f"Page (of {page_count}, {PAGE_ROWS} rows each)", min_value=1, max_value=page_count, step=1, key="result_page"
+    )
+    offset = (page_no - 1) * PAGE_ROWS
+    
+    # Prepared page, reused until the rows it shows change (a full page never does)
+    if filtered:
+        row_ids = match_ids[offset:offset + PAGE_ROWS]
+        page_key = (results.generation, "matches", hl_field, hl_text.strip(), offset, len(row_ids), len(results))
+    else:
+        row_ids = None
+        page_key = (results.generation, "all", offset, min(PAGE_ROWS, len(results) - offset))
+    df = st.session_state.result_pages.get(page_key, lambda: prepare_page(results, offset, row_ids))
+    
+    # Saved rows show ticked; unticking one removes it from the clipboard
+    df["Save"] = df["_id"].isin(clipboard.ids)
     
-    # Show data editor
-    edited_df = st.data_editor(
-        df,
+    table = df
+    if match_ids is not None and not hl_only:
+        is_match = np.isin(np.arange(offset, offset + len(df)), match_ids)
+        styles = np.where(is_match, "background-color: #fef08a", "")
+        table = df.style.apply(
+            lambda frame: pd.DataFrame(np.repeat(styles[:, None], frame.shape[1], axis=1), index=frame.index, columns=frame.columns),
+            axis=None,
+        )
+    
+    # Show data editor (the Save callback runs before the next rerun, no extra rerun needed)
+    editor_key = f"results_editor_{clipboard.generation}_{hash(page_key)}"
+    st.data_editor(
+        table,
         column_config={
             "Save": st.column_config.CheckboxColumn("Save", default=False, width="small"),
             "_id": None,
+            "RegDate": st.column_config.DateColumn("RegDate", format="DD/MM/YYYY"),
             "Amount": st.column_config.NumberColumn("Amount", format="₹%d"),
             "MarketValue": st.column_config.NumberColumn("Market Val", format="₹%d"),
         },
         disabled=[c for c in df.columns if c != "Save"],
         hide_index=True,
         use_container_width=True,
-        height=450
+        height=450,
+        key=editor_key,
+        on_change=apply_saves,
+        args=(editor_key, df),
     )
-    
-    # Process saves
-    saved_rows = edited_df[edited_df["Save"] == True]
-    if not saved_rows.empty:
-        new_items = saved_rows.drop(columns=["Save"]).to_dict('records')
-        existing_ids = {item.get("_id") for item in st.session_state.clipboard}
-        added = 0
-        for item in new_items:
-            if item.get("_id") not in existing_ids:
-                st.session_state.clipboard.append(item)
-                added += 1
-        if added > 0:
-            st.toast(f"Added {added} records to clipboard!")
-            time.sleep(0.8)
-            st.rerun()
 
-    # Download all results
+    # Download all results (written from the store in chunks when clicked)
     st.divider()
-    csv_all = df.drop(columns=["Save", "_id"], errors='ignore').to_csv(index=False).encode('utf-8')
-    st.download_button(
-        "Download All Results (CSV)",
-        data=csv_all,
-        file_name=f"propfind_{name_input}_{from_year}-{to_year}.csv",
-        mime="text/csv"
-    )
+    export_cols = [c for c in DISPLAY_COLS if c != "_id"]
+    file_stem = f"propfind_{name_input}_{from_year}-{to_year}"
+    dl_col1, dl_col2, _ = st.columns([2, 2, 6])
+    with dl_col1:
+        st.download_button(
+            "Download All Results (CSV)",
+            data=lambda: export_results(results, "csv", export_cols),
+            file_name=f"{file_stem}.csv",
+            mime="text/csv"
+        )
+    with dl_col2:
+        st.download_button(
+            "Download All Results (Parquet)",
+            data=lambda: export_results(results, "parquet", export_cols),
+            file_name=f"{file_stem}.parquet",
+            mime="application/octet-stream"
+        )
 
 # ============================================
 # FOOTER
 # ============================================
 st.markdown("---")
-st.caption("PropFind | Educational & Non-Commercial Use Only | No data stored")
+st.caption("PropFind | Educational & Non-Commercial Use Only | Public search results cached locally")
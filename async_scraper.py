@@ -0,0 +1,226 @@
+"""
+Async Property Scraper
+asyncio sibling of PropertyScraperCore.scrape_year built on aiohttp.
+Runs the same GET -> district -> SRO -> year -> search -> pagination sequence
+with non-blocking HTTP and asyncio.sleep, so one event loop can drive hundreds
+of in-flight year/SRO crawls. Yields the exact same event dictionaries.
+
+Payloads and parsing come from scraper_core.PortalForms; the sync crawl API
+(checkpoints, scrape_names, refresh_year, ...) is not part of this class.
+"""
+
+import asyncio
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+
+from scraper_core import PortalForms
+from throttle import AdaptiveThrottle, retry_after_seconds
+
+
+class AsyncRateLimiter:
+    """asyncio counterpart of scrape_engine.RateLimiter: one request every `min_interval` seconds per host."""
+
+    def __init__(self, min_interval=0.5):
+        self.min_interval = min_interval
+        self._next_slot = {}
+
+    async def acquire(self, host=""):
+        """Wait until the caller may send its next request to `host`."""
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AsyncPropertyScraper(PortalForms):
+    """Async backend: same payloads and parsing as PropertyScraperCore, non-blocking transport."""
+
+    def __init__(self, search_type="buyer", rate_limiter=None, connector=None, throttle=None, parser="fast",
+                 base_url=None, max_retries=3, retry_backoff=2.0):
+        """
+        rate_limiter: optional shared AsyncRateLimiter.
+        connector: optional shared aiohttp.TCPConnector so many crawls reuse one pool.
+        throttle: delay controller between steps (defaults to an AdaptiveThrottle).
+        base_url: search page URL overriding URLS.
+        max_retries / retry_backoff: as for PropertyScraperCore (network errors, 429/5xx).
+        """
+        super().__init__(search_type=search_type, parser=parser, base_url=base_url)
+        self.rate_limiter = rate_limiter
+        self.throttle = throttle if throttle is not None else AdaptiveThrottle()
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.connector = connector
+
+    def _session(self):
+        """New client session per crawl (own cookie jar), optionally over a shared connector."""
+        return aiohttp.ClientSession(
+            headers=self.headers,
+            connector=self.connector,
+            connector_owner=self.connector is None,
+            timeout=aiohttp.ClientTimeout(total=60),
+        )
+
+    async def _send(self, s, method, headers=None, data=None):
+        """
+        Issue a request to the search page and return the body bytes, retrying transient
+        failures (network errors, 429/5xx) with exponential backoff like PropertyScraperCore._attempt.
+        Raises the last error once the retries are used up.
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(urlparse(self.base_url).netloc)
+            started = time.monotonic()
+            try:
+                async with s.request(method, self.base_url, headers=headers, data=data) as r:
+                    body = await r.read()
+                self.throttle.record(
+                    time.monotonic() - started, status=r.status, retry_after=retry_after_seconds(r.headers)
+                )
+                if r.status == 429 or r.status >= 500:
+                    raise aiohttp.ClientResponseError(
+                        r.request_info, r.history, status=r.status, message=f"HTTP {r.status}"
+                    )
+                return body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not isinstance(e, aiohttp.ClientResponseError):
+                    self.throttle.record(time.monotonic() - started, error=True)
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+    async def scrape_year(self, district_id, sro_id, year, name_pattern):
+        """
+        Async generator that scrapes data for a single year.
+        Yields status updates and data as it progresses.
+        """
+        total = 0
+
+        # CRITICAL: Fresh session (cookie jar) per year
+        async with self._session() as s:
+            yield {"status": "info", "message": f"Starting session for Year {year}..."}
+
+            # 1. Initial GET
+            try:
+                body = await self._send(s, "GET")
+                vs = self.page_hidden_fields(body)
+            except Exception as e:
+                yield {"status": "error", "message": f"Initial load failed: {str(e)}"}
+                return
+
+            await asyncio.sleep(self.throttle.next_delay())
+
+            # 2-4. District, SRO and Year (AJAX postbacks)
+            steps = [
+                ("District", district_id, "ddl_dis", (district_id,)),
+                ("SRO", sro_id, "ddl_sro", (district_id, sro_id)),
+                ("Year", year, "dd_regyear", (district_id, sro_id, year)),
+            ]
+            for label, value, target, args in steps:
+                yield {"status": "info", "message": f"Selecting {label} {value}..."}
+                try:
+                    payload = self.build_dropdown_payload(vs, target, *args)
+                    body = await self._send(s, "POST", headers=self.ajax_headers, data=payload)
+                    self.merge_ajax_fields(vs, body)
+                except Exception as e:
+                    yield {"status": "error", "message": f"{label} selection failed: {str(e)}"}
+                    return
+
+                await asyncio.sleep(self.throttle.next_delay())
+
+            # 5. Search - FULL PAGE POST (not AJAX!)
+            yield {"status": "info", "message": f"Searching for '{name_pattern}'..."}
+
+            try:
+                search_payload = self.build_search_payload(vs, district_id, sro_id, year, name_pattern)
+                body = await self._send(s, "POST", headers=self.form_headers, data=search_payload)
+                page = self.parse_page(body)
+            except Exception as e:
+                yield {"status": "error", "message": f"Search failed: {str(e)}"}
+                return
+
+            # 6. Pagination Loop
+            page_num = 1
+            while True:
+                page_results = page.records
+                total += len(page_results)
+
+                yield {
+                    "status": "data",
+                    "year": year,
+                    "page": page_num,
+                    "count": len(page_results),
+                    "data": page_results,
+                    "rate": self.throttle.rate(),
+                }
+
+                next_page_arg = page.next_page(page_num)
+                if not next_page_arg:
+                    break
+
+                await asyncio.sleep(self.throttle.next_delay())
+
+                yield {"status": "info", "message": f"Navigating to page {page_num + 1}..."}
+
+                pagination_payload = self.build_pagination_payload(
+                    page.hidden_fields, next_page_arg, district_id, sro_id, year, name_pattern
+                )
+                try:
+                    body = await self._send(s, "POST", headers=self.form_headers, data=pagination_payload)
+                    page = self.parse_page(body)
+                    page_num += 1
+                except Exception as e:
+                    yield {"status": "error", "message": f"Pagination failed: {str(e)}"}
+                    break
+
+        yield {"status": "done", "year": year, "total": total, "rate": self.throttle.rate()}
+
+
+async def scrape_many(jobs, search_type="buyer", max_concurrency=100, rate_limiter=None, throttle=None,
+                      base_url=None, retry_backoff=2.0):
+    """
+    Drive many (district_id, sro_id, year, name_pattern) crawls on one event loop.
+    Async generator merging every crawl's updates; each update is tagged with
+    "year", "district" and "sro" so callers can tell the streams apart.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+
+    events = asyncio.Queue()
+    gate = asyncio.Semaphore(max_concurrency)
+    finished = object()
+
+    async with aiohttp.TCPConnector(limit=max_concurrency) as connector:
+        scraper = AsyncPropertyScraper(
+            search_type=search_type, rate_limiter=rate_limiter, connector=connector, throttle=throttle,
+            base_url=base_url, retry_backoff=retry_backoff,
+        )
+
+        async def run(district_id, sro_id, year, name_pattern):
+            try:
+                async with gate:
+                    async for update in scraper.scrape_year(district_id, sro_id, year, name_pattern):
+                        update.setdefault("year", year)
+                        update["district"] = district_id
+                        update["sro"] = sro_id
+                        await events.put(update)
+            finally:
+                await events.put(finished)
+
+        tasks = [asyncio.create_task(run(*job)) for job in jobs]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                update = await events.get()
+                if update is finished:
+                    remaining -= 1
+                    continue
+                yield update
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
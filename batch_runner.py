@@ -0,0 +1,341 @@
+"""
+Headless Batch Query Runner
+Runs many name searches across districts, SROs and years without the UI.
+
+The job matrix is name x district x SRO x year. Names sharing a (district, SRO,
+year) are searched in one portal session via PropertyScraperCore.scrape_names,
+so the dropdown postbacks are paid once per group. Groups run on a worker pool
+under one global rate limit; records are de-duplicated by the same _id as the
+UI (district + SRO + year + RegNo + RegDate) and written incrementally to CSV
+or Parquet.
+
+Usage:
+    python batch_runner.py names.csv --district 12 --sro all --years 2015-2020 -o results.csv
+    python batch_runner.py jobs.csv --type seller -o results.parquet --workers 6 --rate 1.0
+    python batch_runner.py names.csv --district 12 --years 2019 -o out.csv --metrics stages.prom
+    python batch_runner.py names.csv --district all --years 2009-2026 -o out.csv --catalog propfind_catalog.json
+    python batch_runner.py watch.csv --district 12 --sro 03 --years 2026 --cache cache.sqlite3 --refresh -o new.csv
+
+The input CSV needs a "name" column (otherwise its first column is used).
+Optional "district", "sro" and "year" columns override the command-line
+defaults per row; "sro" may be "all" and "year" may be a range like 2015-2020.
+With --catalog, "all" SROs come from the availability catalog and groups whose
+SRO does not offer the year are dropped before any request is sent.
+
+With --refresh (needs --cache) every search is an incremental refresh of its
+cached result: pagination stops once it reaches pages already cached, and only
+new registrations are written. Meant for daily monitoring of the current year.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from itertools import product
+
+from catalog import Catalog
+from districts import DISTRICTS, SRO_BY_DISTRICT
+from metrics import StageMetrics
+from page_parser import RECORD_FIELDS, record_id
+from result_cache import MATCH_FIELD, CachedScraper, ResultCache, covers, filter_pages
+from scrape_engine import ParallelScraper, RateLimiter, merge_streams
+from search_index import normalize
+
+OUTPUT_FIELDS = ["Year", "Query", "DistrictId", "SroId"] + list(RECORD_FIELDS) + ["_id"]
+
+
+def parse_years(spec):
+    """'2019' -> ['2019'], '2015-2017' -> ['2015', '2016', '2017'], '2015,2018' -> both."""
+    years = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(p) for p in part.split("-", 1))
+            years.extend(str(y) for y in range(min(start, end), max(start, end) + 1))
+        else:
+            years.append(str(int(part)))
+    return years
+
+
+def expand_codes(spec, choices):
+    """Comma separated codes, or 'all' for every key of `choices`."""
+    spec = str(spec).strip()
+    if spec.lower() == "all":
+        return list(choices)
+    return [code.strip().zfill(2) for code in spec.split(",") if code.strip()]
+
+
+def read_jobs(path, default_district, default_sro, default_years, catalog=None):
+    """Expand the input CSV into {(district, sro, year): [names]} groups."""
+    groups = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        name_col = "name" if "name" in (reader.fieldnames or []) else (reader.fieldnames or [None])[0]
+        if name_col is None:
+            return groups
+        for row in reader:
+            name = (row.get(name_col) or "").strip()
+            if not name:
+                continue
+            districts = expand_codes(row.get("district") or default_district or "", DISTRICTS)
+            years = parse_years(row.get("year") or default_years or "")
+            for district_id in districts:
+                known = catalog.sros(district_id) if catalog is not None else None
+                sros = expand_codes(row.get("sro") or default_sro or "", known or SRO_BY_DISTRICT.get(district_id, {}))
+                for sro_id, year in product(sros, years):
+                    names = groups.setdefault((district_id, sro_id, year), [])
+                    if name not in names:
+                        names.append(name)
+    return groups
+
+
+class CsvSink:
+    """Incremental CSV writer (flushed after every page)."""
+
+    def __init__(self, path):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """Incremental Parquet writer: one row group per results page."""
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([(field, pa.string()) for field in OUTPUT_FIELDS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        columns = {field: [row.get(field, "") for row in rows] for field in OUTPUT_FIELDS}
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def open_sink(path):
+    if path.lower().endswith(".parquet"):
+        try:
+            return ParquetSink(path)
+        except ImportError:
+            sys.exit("Parquet output needs pyarrow (pip install pyarrow)")
+    return CsvSink(path)
+
+
+class BatchRunner:
+    """Schedules (district, SRO, year) groups of names and aggregates their results."""
+
+    def __init__(self, search_type="buyer", max_workers=4, min_interval=0.5, cache=None, page_workers=1,
+                 metrics=None, catalog=None, refresh=False):
+        """refresh: incrementally refresh each cached search, yielding only new records (needs `cache`)."""
+        self.engine = ParallelScraper(
+            search_type=search_type, max_workers=max_workers, rate_limiter=RateLimiter(min_interval),
+            page_workers=page_workers, on_timing=metrics, catalog=catalog,
+        )
+        self.metrics = metrics
+        self.cache = cache
+        self.catalog = catalog
+        self.refresh = refresh
+        self.seen = set()
+        self.stats = {"jobs": 0, "jobs_done": 0, "records": 0, "unique": 0, "cached": 0, "pruned": 0}
+        self.failures = []
+        self.started = time.monotonic()
+
+    def _replay(self, year, name, pages):
+        for page, records in pages:
+            yield {"status": "data", "year": year, "name": name, "page": page,
+                   "count": len(records), "data": records, "cached": True}
+        yield {"status": "done", "year": year, "name": name,
+               "total": sum(len(r) for _, r in pages), "cached": True}
+
+    def _group_stream(self, district_id, sro_id, year, names):
+        """
+        Generator for one group: names answered by the cache (exactly or by a broader
+        cached search) are replayed, the rest share one portal session. A name that
+        contains another pending name is filtered from that crawl instead of searched.
+        """
+        if self.refresh:
+            scraper = CachedScraper(self.engine.core(), self.cache)
+            for name in names:
+                for update in scraper.refresh_year(district_id, sro_id, year, name):
+                    update["name"] = name
+                    yield update
+            return
+
+        search_type = self.engine.search_type
+        pending = []
+        for name in names:
+            pages = self.cache.lookup(search_type, district_id, sro_id, year, name) if self.cache else None
+            if pages is None:
+                pending.append(name)
+            else:
+                yield from self._replay(year, name, pages)
+
+        # Broadest first, so a narrower name finds the pending search covering it
+        network, derived = [], {}
+        for name in sorted(pending, key=lambda n: len(normalize(n))):
+            broad = next((other for other in network if covers(other, name)), None)
+            if broad is None:
+                network.append(name)
+            else:
+                derived[name] = broad
+        if not network:
+            return
+
+        collected = {name: [] for name in network}
+        completed = set()
+        failed = set()
+        for update in self.engine.core().scrape_names(district_id, sro_id, year, network):
+            name = update.get("name")
+            if update["status"] == "data":
+                collected[name].append((update["page"], [dict(rec) for rec in update["data"]]))
+            elif update["status"] == "error" and name is not None:
+                failed.add(name)
+            elif update["status"] == "done" and name not in failed:
+                completed.add(name)
+                if self.cache is not None:
+                    self.cache.put(search_type, district_id, sro_id, year, name, collected[name])
+            yield update
+
+        for name, broad in derived.items():
+            if broad in completed:
+                yield from self._replay(year, name, filter_pages(collected[broad], MATCH_FIELD[search_type], name))
+            else:
+                yield {"status": "error", "year": year, "name": name,
+                       "message": f"covering search '{broad}' did not complete"}
+
+    def prune(self, groups):
+        """Drop groups whose SRO does not offer the year according to the catalog."""
+        if self.catalog is None:
+            return groups
+        kept = {}
+        for (d, s, y), names in groups.items():
+            if self.catalog.prune(d, s, [y])[0]:
+                kept[(d, s, y)] = names
+            else:
+                self.stats["pruned"] += len(names)
+                self.stats["jobs_done"] += len(names)
+        return kept
+
+    def run(self, groups, sink, progress_every=10.0, out=sys.stderr):
+        """Crawl every group, writing de-duplicated rows to `sink`; returns the stats dict."""
+        self.stats["jobs"] = sum(len(names) for names in groups.values())
+        groups = self.prune(groups)
+        streams = [
+            ({"district": d, "sro": s, "year": y}, lambda d=d, s=s, y=y, n=names: self._group_stream(d, s, y, n))
+            for (d, s, y), names in groups.items()
+        ]
+        last_report = time.monotonic()
+        for update in merge_streams(streams, self.engine.max_workers):
+            status = update["status"]
+            if status == "data":
+                self._write(update, sink)
+            elif status == "done" and "name" in update:
+                self.stats["jobs_done"] += 1
+                if update.get("cached"):
+                    self.stats["cached"] += 1
+            elif status == "error":
+                self.failures.append(
+                    f"{update['district']}/{update['sro']}/{update['year']} "
+                    f"{update.get('name', '*')}: {update['message']}"
+                )
+            if time.monotonic() - last_report >= progress_every:
+                print(self.summary(), file=out, flush=True)
+                last_report = time.monotonic()
+        return self.stats
+
+    def _write(self, update, sink):
+        year = update["year"]
+        rows = []
+        for rec in update["data"]:
+            self.stats["records"] += 1
+            # RegNo sequences are per SRO: the same RegNo and date in another SRO is another deed
+            rid = record_id(year, rec, update["district"], update["sro"])
+            if rid in self.seen:
+                continue
+            self.seen.add(rid)
+            row = dict(rec)
+            row.update({
+                "Year": year, "Query": update.get("name", ""),
+                "DistrictId": update["district"], "SroId": update["sro"], "_id": rid,
+            })
+            rows.append(row)
+        if rows:
+            self.stats["unique"] += len(rows)
+            sink.write(rows)
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        s = self.stats
+        return (
+            f"[{elapsed:7.1f}s] jobs {s['jobs_done']}/{s['jobs']} ({s['cached']} cached, {s['pruned']} pruned) | "
+            f"records {s['records']} ({s['unique']} unique, {s['records'] / elapsed:.1f}/s) | "
+            f"requests {self.engine.throttle.rate():.2f}/s | failures {len(self.failures)}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV with a 'name' column (optional district/sro/year columns)")
+    parser.add_argument("-o", "--output", required=True, help="output file (.csv or .parquet)")
+    parser.add_argument("--type", choices=["buyer", "seller"], default="buyer", help="search type")
+    parser.add_argument("--district", help="default district code(s), comma separated or 'all'")
+    parser.add_argument("--sro", default="all", help="default SRO code(s), comma separated or 'all'")
+    parser.add_argument("--years", help="default years, e.g. 2019 or 2015-2020")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent portal sessions")
+    parser.add_argument("--page-workers", type=int, default=1,
+                        help="results pages of one search fetched concurrently")
+    parser.add_argument("--rate", type=float, default=0.5, help="minimum seconds between requests to the portal")
+    parser.add_argument("--cache", help="ResultCache SQLite file to reuse and fill")
+    parser.add_argument("--refresh", action="store_true",
+                        help="only fetch registrations newer than the cached results (needs --cache)")
+    parser.add_argument("--catalog", help="availability catalog JSON (see catalog.py) used to skip empty SRO/years")
+    parser.add_argument("--metrics", help="write per-stage timing histograms (.prom for Prometheus, else JSON)")
+    parser.add_argument("--progress", type=float, default=10.0, help="seconds between progress lines")
+    args = parser.parse_args(argv)
+
+    catalog = Catalog(args.catalog) if args.catalog else None
+    if args.refresh and not args.cache:
+        parser.error("--refresh needs --cache")
+    groups = read_jobs(args.input, args.district, args.sro, args.years, catalog)
+    if not groups:
+        sys.exit("no jobs: check the input names, --district and --years")
+    print(f"{sum(len(n) for n in groups.values())} searches in {len(groups)} district/SRO/year groups",
+          file=sys.stderr)
+
+    cache = ResultCache(args.cache) if args.cache else None
+    metrics = StageMetrics() if args.metrics else None
+    runner = BatchRunner(args.type, args.workers, args.rate, cache, args.page_workers, metrics, catalog, args.refresh)
+    sink = open_sink(args.output)
+    try:
+        runner.run(groups, sink, args.progress)
+    except KeyboardInterrupt:
+        print("interrupted, partial results kept", file=sys.stderr)
+    finally:
+        sink.close()
+        if metrics is not None:
+            metrics.write(args.metrics)
+
+    print(runner.summary(), file=sys.stderr)
+    for failure in runner.failures:
+        print(f"  FAILED {failure}", file=sys.stderr)
+    print(f"wrote {runner.stats['unique']} records to {os.path.abspath(args.output)}", file=sys.stderr)
+    return 1 if runner.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Benchmark and fuzz check: UpdatePanel delta response parsers.
+Compares the previous split('|') parser with ajax_delta.parse_delta.
+
+Micro-benchmark: parses a realistic dropdown postback delta (large ViewState plus
+an UpdatePanel) and reports parses/sec and peak traced memory.
+Fuzz: random deltas whose content contains '|', Devanagari and non-BMP
+characters; every parser's output is checked against the encoded segments.
+
+Usage:
+    python benchmarks/bench_ajax_delta.py [--viewstate BYTES] [--repeat N] [--fuzz N] [--seed N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ajax_delta import parse_delta  # noqa: E402
+from benchmarks.synthetic import postback_delta, random_delta  # noqa: E402
+
+
+def legacy_parse_ajax_response(text):
+    """The parser scraper_core used before ajax_delta (kept for comparison)."""
+    parts = text.split('|')
+    result = {}
+    i = 0
+    while i < len(parts) - 3:
+        try:
+            int(parts[i])
+            ptype = parts[i+1]
+            pid = parts[i+2]
+            content = parts[i+3]
+            if ptype == 'hiddenField':
+                result[pid] = content
+            elif ptype == 'updatePanel':
+                result[f"panel_{pid}"] = content
+            i += 4
+        except (ValueError, IndexError):
+            i += 1
+    return result
+
+
+PARSERS = {
+    # The old parser needs the decoded body, so decoding is part of its cost
+    "split": lambda raw: legacy_parse_ajax_response(raw.decode("utf-8")),
+    "delta": lambda raw: parse_delta(raw),
+    "delta+panels": lambda raw: parse_delta(raw, types=("hiddenField", "updatePanel")),
+}
+
+
+def expected(segments, types=("hiddenField", "updatePanel")):
+    result = {}
+    for ptype, pid, content in segments:
+        if ptype == "hiddenField" and ptype in types:
+            result[pid] = content
+        elif ptype == "updatePanel" and ptype in types:
+            result[f"panel_{pid}"] = content
+    return result
+
+
+def bench(raw, repeat):
+    for name, parse in PARSERS.items():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            parse(raw)
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        parse(raw)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>13}: {repeat / elapsed:9.1f} parses/sec   peak {peak / 1024:8.1f} KiB")
+
+
+def fuzz(cases, seed):
+    rnd = random.Random(seed)
+    failures = {"split": 0, "delta": 0}
+    for _ in range(cases):
+        raw, segments = random_delta(rnd)
+        if legacy_parse_ajax_response(raw.decode("utf-8")) != expected(segments):
+            failures["split"] += 1
+        if parse_delta(raw, types=("hiddenField", "updatePanel")) != expected(segments):
+            failures["delta"] += 1
+        if parse_delta(raw) != expected(segments, types=("hiddenField",)):
+            failures["delta"] += 1
+    for name, count in failures.items():
+        print(f"{name:>13}: {count}/{cases} fuzz cases wrong")
+    return failures["delta"] == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--viewstate", type=int, default=200_000, help="synthetic __VIEWSTATE size")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--fuzz", type=int, default=2000, help="random deltas to check (0 to skip)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    raw = postback_delta(args.viewstate)
+    print(f"delta body: {len(raw) / 1024:.0f} KiB")
+    bench(raw, args.repeat)
+    if args.fuzz and not fuzz(args.fuzz, args.seed):
+        sys.exit("parse_delta disagrees with the encoded segments")
+
+
+if __name__ == "__main__":
+    main()
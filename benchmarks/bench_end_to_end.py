@@ -0,0 +1,276 @@
+"""
+Benchmark: end-to-end scraping against the local mock portal.
+Starts benchmarks/mock_portal.py in a child process (so the server does not
+compete with the scraper for the GIL) and runs the scraper front ends through
+the full GET / postback / search / pagination flow, reporting requests/sec,
+records/sec, bytes on the wire, connections opened, time spent parsing
+results pages and peak traced memory. Results can be saved as JSON and
+compared with a saved baseline to catch regressions.
+
+Every scenario must also return exactly the records and results pages the
+mock portal serves (MockPortal.total_records / page_count) with at least one
+request per page and form step; otherwise the benchmark exits non-zero.
+
+Usage:
+    python benchmarks/bench_end_to_end.py [--records N] [--latency S] [--years N] [--page-workers N]
+    python benchmarks/bench_end_to_end.py --json baseline.json
+    python benchmarks/bench_end_to_end.py --baseline baseline.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_portal import MockPortal  # noqa: E402
+from scrape_engine import ParallelScraper, RateLimiter  # noqa: E402
+from scraper_core import PortalForms, PropertyScraperCore  # noqa: E402
+from throttle import FixedThrottle  # noqa: E402
+
+MOCK_PORTAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_portal.py")
+
+
+class ParseTimer:
+    """Accumulates time spent in PortalForms.parse_page (sync and async scrapers) across threads."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.pages = 0
+        self._lock = threading.Lock()
+        original = PortalForms.parse_page
+
+        def timed(scraper, content):
+            started = time.perf_counter()
+            try:
+                return original(scraper, content)
+            finally:
+                with self._lock:
+                    self.seconds += time.perf_counter() - started
+                    self.pages += 1
+
+        PortalForms.parse_page = timed
+
+    def reset(self):
+        with self._lock:
+            self.seconds, self.pages = 0.0, 0
+
+
+class Portal:
+    """mock_portal.py running in a child process."""
+
+    def __init__(self, args):
+        self.process = subprocess.Popen(
+            [sys.executable, MOCK_PORTAL, "--port", "0", "--records", str(args.records), "--rows", str(args.rows),
+             "--latency", str(args.latency), "--error-rate", str(args.error_rate), "--viewstate", str(args.viewstate)],
+            stdout=subprocess.PIPE, text=True,
+        )
+        self.url = self.process.stdout.readline().strip()
+        if not self.url:
+            sys.exit("mock portal did not start")
+        self.root = self.url.split("/e_search/")[0]
+        # Same result model as the child, for the expected counts (its own server is never started)
+        self.model = MockPortal(records=args.records, rows_per_page=args.rows)
+        self.model.server.server_close()
+
+    def expected(self, name_pattern, years):
+        """(records, results pages, minimum requests) a complete crawl of `years` must see."""
+        records = sum(self.model.total_records(name_pattern, year) for year in years)
+        pages = sum(self.model.page_count(name_pattern, year) for year in years)
+        # GET + 3 dropdown postbacks + the search and pagination POSTs, per year
+        return records, pages, pages + 4 * len(years)
+
+    def stats(self):
+        with urlopen(f"{self.root}/_stats") as r:
+            return json.load(r)
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+def count_records(updates):
+    records = 0
+    pages = 0
+    errors = []
+    for update in updates:
+        if update["status"] == "data":
+            records += update["count"]
+            pages += 1
+        elif update["status"] == "error":
+            errors.append(update["message"])
+    return records, pages, errors
+
+
+def bench_years(args):
+    return [str(2024 - i) for i in range(args.years)]
+
+
+def scenarios(args, url):
+    """name -> callable running one workload and returning (records, pages, errors)."""
+    years = bench_years(args)
+
+    def core(page_workers):
+        return PropertyScraperCore(
+            base_url=url, throttle=FixedThrottle(args.delay), page_workers=page_workers, retry_backoff=0.05,
+        )
+
+    def sequential():
+        updates = []
+        for year in years:
+            updates.extend(core(1).scrape_year("12", "03", year, "राम"))
+        return count_records(updates)
+
+    def page_workers():
+        updates = []
+        for year in years:
+            updates.extend(core(args.page_workers).scrape_year("12", "03", year, "राम"))
+        return count_records(updates)
+
+    def parallel_years():
+        engine = ParallelScraper(
+            max_workers=args.workers, rate_limiter=RateLimiter(args.rate), throttle=FixedThrottle(args.delay),
+            page_workers=args.page_workers, base_url=url,
+        )
+        return count_records(engine.scrape_years("12", "03", years, "राम"))
+
+    def async_years():
+        from async_scraper import scrape_many
+
+        async def run():
+            jobs = [("12", "03", year, "राम") for year in years]
+            return [u async for u in scrape_many(
+                jobs, throttle=FixedThrottle(args.delay), base_url=url, retry_backoff=0.05,
+            )]
+
+        return count_records(asyncio.run(run()))
+
+    return {
+        "sequential": sequential,
+        "page-workers": page_workers,
+        "parallel-years": parallel_years,
+        "async": async_years,
+    }
+
+
+def measure(name, workload, portal, timer, expected):
+    """
+    Time one run of `workload`, then measure peak memory on a second traced run.
+    expected: (records, pages, minimum requests) from Portal.expected(); "mismatches" lists
+    where the timed run fell short of it.
+    """
+    before = portal.stats()
+    timer.reset()
+    started = time.perf_counter()
+    records, pages, errors = workload()
+    elapsed = time.perf_counter() - started
+    after = portal.stats()
+    parse_seconds, parsed = timer.seconds, timer.pages
+
+    tracemalloc.start()
+    workload()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    requests = after["requests"] - before["requests"]
+    mismatches = []
+    if records != expected[0]:
+        mismatches.append(f"{records} records, the portal served {expected[0]}")
+    if pages != expected[1]:
+        mismatches.append(f"{pages} results pages, the portal has {expected[1]}")
+    if requests < expected[2]:
+        mismatches.append(f"{requests} requests, a complete crawl needs at least {expected[2]}")
+    return {
+        "scenario": name,
+        "seconds": elapsed,
+        "requests": requests,
+        "requests_per_sec": requests / elapsed,
+        "records": records,
+        "records_per_sec": records / elapsed,
+        "bytes": after["bytes"] - before["bytes"],
+        "wire_bytes": after["wire_bytes"] - before["wire_bytes"],
+        # minus the connection of the /_stats request itself
+        "connections": after["connections"] - before["connections"] - 1,
+        "parse_ms_per_page": 1000 * parse_seconds / parsed if parsed else 0.0,
+        "peak_mib": peak / 1024 / 1024,
+        "errors": len(errors),
+        "mismatches": mismatches,
+    }
+
+
+def compare(results, baseline_path, tolerance):
+    """Regressions (records/sec below baseline by more than `tolerance`) as messages."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {row["scenario"]: row for row in json.load(f)}
+    failures = []
+    for row in results:
+        base = baseline.get(row["scenario"])
+        if base is None:
+            continue
+        if row["records_per_sec"] < base["records_per_sec"] * (1 - tolerance):
+            failures.append(
+                f"{row['scenario']}: {row['records_per_sec']:.1f} records/sec vs baseline {base['records_per_sec']:.1f}"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=400, help="results per search")
+    parser.add_argument("--rows", type=int, default=20, help="rows per results page")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock portal response latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of portal requests failing")
+    parser.add_argument("--viewstate", type=int, default=20_000, help="__VIEWSTATE size")
+    parser.add_argument("--years", type=int, default=4, help="years searched per scenario")
+    parser.add_argument("--workers", type=int, default=4, help="ParallelScraper year workers")
+    parser.add_argument("--page-workers", type=int, default=4, help="concurrent result pages")
+    parser.add_argument("--delay", type=float, default=0.0, help="throttle delay between steps")
+    parser.add_argument("--rate", type=float, default=0.0, help="RateLimiter min interval")
+    parser.add_argument("--scenario", action="append", help="run only these scenarios")
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed records/sec drop vs baseline")
+    args = parser.parse_args()
+
+    portal = Portal(args)
+    timer = ParseTimer()
+    results = []
+    mismatches = []
+    try:
+        print(f"mock portal {portal.url}: {args.records} records x {args.years} years, "
+              f"{args.latency * 1000:.0f} ms latency")
+        for name, workload in scenarios(args, portal.url).items():
+            if args.scenario and name not in args.scenario:
+                continue
+            row = measure(name, workload, portal, timer, portal.expected("राम", bench_years(args)))
+            results.append(row)
+            print(f"{name:>15}: {row['seconds']:6.2f}s  {row['requests_per_sec']:7.1f} req/s  "
+                  f"{row['records_per_sec']:8.1f} records/s  {row['wire_bytes'] / 1024 / 1024:6.1f} MiB  "
+                  f"{row['connections']:3d} conns  "
+                  f"parse {row['parse_ms_per_page']:5.2f} ms/page  peak {row['peak_mib']:6.2f} MiB  "
+                  f"errors {row['errors']}")
+            mismatches.extend(f"{name}: {mismatch}" for mismatch in row["mismatches"])
+    finally:
+        portal.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    failures = compare(results, args.baseline, args.tolerance) if args.baseline else []
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if mismatches or failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: hidden-field extraction and postback encoding per request.
+Compares the previous dict-of-str flow (BeautifulSoup or regex extraction,
+payload dict rebuilt and urlencoded for every request) with form_state's
+bytes-level FormState and pre-encoded FormTemplate bodies, for the two
+requests that carry the ViewState: a Page$N postback after a results page and
+a dropdown postback after an UpdatePanel delta.
+
+Reports microseconds per request and peak traced memory as a multiple of the
+ViewState size (roughly, the number of ViewState copies alive at once).
+Every flow's request body is checked against the legacy one.
+
+Usage:
+    python benchmarks/bench_form_state.py [--viewstate BYTES] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from ajax_delta import parse_delta  # noqa: E402
+from benchmarks.synthetic import postback_delta, results_page  # noqa: E402
+from form_state import HIDDEN_FIELDS, FormState  # noqa: E402
+from page_parser import extract_hidden_fields  # noqa: E402
+from scraper_core import PropertyScraperCore  # noqa: E402
+
+FORM = ("12", "03", "2019", "राम")
+
+
+def legacy_pagination_payload(vs, page_arg, district_id, sro_id, year, name_pattern):
+    """The dict scraper_core built before form_state (requests urlencoded it)."""
+    return {
+        "__EVENTTARGET": "ctl00$MainContent$GridView2",
+        "__EVENTARGUMENT": page_arg,
+        "__LASTFOCUS": "",
+        "__VIEWSTATE": vs.get("__VIEWSTATE", ""),
+        "__VIEWSTATEGENERATOR": vs.get("__VIEWSTATEGENERATOR", ""),
+        "__EVENTVALIDATION": vs.get("__EVENTVALIDATION", ""),
+        "ctl00$MainContent$ddl_dis": district_id,
+        "ctl00$MainContent$ddl_sro": sro_id,
+        "ctl00$MainContent$dd_regyear": year,
+        "propAddress": name_pattern,
+    }
+
+
+def legacy_dropdown_payload(vs, target, district_id, sro_id="", year=""):
+    return {
+        "ctl00$ScriptManager1": f"ctl00$MainContent$UpdatePanel1|ctl00$MainContent${target}",
+        "__EVENTTARGET": f"ctl00$MainContent${target}",
+        "__EVENTARGUMENT": "",
+        "__LASTFOCUS": "",
+        "__VIEWSTATE": vs.get("__VIEWSTATE", ""),
+        "__VIEWSTATEGENERATOR": vs.get("__VIEWSTATEGENERATOR", ""),
+        "__EVENTVALIDATION": vs.get("__EVENTVALIDATION", ""),
+        "ctl00$MainContent$ddl_dis": district_id,
+        "ctl00$MainContent$ddl_sro": sro_id,
+        "ctl00$MainContent$dd_regyear": year,
+        "propAddress": "",
+        "__ASYNCPOST": "true",
+    }
+
+
+def soup_hidden_fields(raw):
+    soup = BeautifulSoup(raw, "html.parser")
+    data = {}
+    for item in HIDDEN_FIELDS:
+        element = soup.find("input", {"id": item})
+        if element:
+            data[item] = element.get("value", "")
+    return data
+
+
+def flows(page, delta):
+    """name -> (callable building one request body from a response, kind)."""
+    core = PropertyScraperCore()
+    district_id, sro_id, year, name = FORM
+    base = FormState.from_page(page).to_dict()
+
+    def dropdown_legacy():
+        vs = dict(base)
+        vs.update(parse_delta(delta, ids=HIDDEN_FIELDS))
+        return urlencode(legacy_dropdown_payload(vs, "ddl_sro", district_id, sro_id)).encode("utf-8")
+
+    def dropdown_state():
+        vs = FormState.from_fields(base).merge_delta(delta)
+        return core.build_dropdown_payload(vs, "ddl_sro", district_id, sro_id)
+
+    return {
+        "page soup+dict": (lambda: urlencode(legacy_pagination_payload(
+            soup_hidden_fields(page), "Page$2", district_id, sro_id, year, name)).encode("utf-8"), "page"),
+        "page regex+dict": (lambda: urlencode(legacy_pagination_payload(
+            extract_hidden_fields(page), "Page$2", district_id, sro_id, year, name)).encode("utf-8"), "page"),
+        "page FormState": (lambda: core.build_pagination_payload(
+            FormState.from_page(page), "Page$2", district_id, sro_id, year, name), "page"),
+        "delta dict": (dropdown_legacy, "delta"),
+        "delta FormState": (dropdown_state, "delta"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--viewstate", type=int, default=200_000, help="synthetic __VIEWSTATE size")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    page = results_page(1, 5, 20, viewstate_size=args.viewstate, seed=1)
+    delta = postback_delta(args.viewstate)
+    print(f"results page {len(page) / 1024:.0f} KiB, delta {len(delta) / 1024:.0f} KiB")
+
+    reference = {}
+    for name, (build, kind) in flows(page, delta).items():
+        body = build()
+        if reference.setdefault(kind, body) != body:
+            sys.exit(f"{name}: request body differs from the legacy one")
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            build()
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        build()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>16}: {1e6 * elapsed / args.repeat:9.1f} us/request   "
+              f"peak {peak / 1024:8.1f} KiB ({peak / args.viewstate:4.1f}x ViewState)")
+
+
+if __name__ == "__main__":
+    main()
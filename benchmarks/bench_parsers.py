@@ -0,0 +1,87 @@
+"""
+Benchmark: results page parsing engines.
+Compares the BeautifulSoup html.parser path (parse_table + check_pagination +
+get_hidden_fields) with page_parser's single-pass engine on recorded pages
+(a directory of saved .html responses) or synthetic ones, reporting pages/sec
+and peak traced memory, and checking that both engines produce identical output.
+
+Usage:
+    python benchmarks/bench_parsers.py [--pages-dir DIR] [--pages N] [--rows N] [--viewstate BYTES] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper_core import PropertyScraperCore  # noqa: E402
+from benchmarks.synthetic import results_page  # noqa: E402
+
+
+def load_pages(args):
+    if args.pages_dir:
+        names = sorted(n for n in os.listdir(args.pages_dir) if n.endswith((".html", ".htm")))
+        pages = []
+        for name in names:
+            with open(os.path.join(args.pages_dir, name), "rb") as f:
+                pages.append(f.read())
+        return pages
+    return [results_page(p, args.pages, args.rows, args.viewstate) for p in range(1, args.pages + 1)]
+
+
+def parse_all(scraper, pages):
+    outputs = []
+    for i, raw in enumerate(pages, start=1):
+        page = scraper.parse_page(raw)
+        outputs.append((page.records, page.next_page(i), page.hidden_fields))
+    return outputs
+
+
+def run_engine(engine, pages, repeat):
+    """Time `repeat` passes over all pages, then measure peak memory on one traced pass."""
+    scraper = PropertyScraperCore(parser=engine)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        outputs = parse_all(scraper, pages)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    parse_all(scraper, pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return outputs, len(pages) * repeat / elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages-dir", help="directory of recorded results pages (.html)")
+    parser.add_argument("--pages", type=int, default=20, help="synthetic pages to generate")
+    parser.add_argument("--rows", type=int, default=20, help="rows per synthetic page")
+    parser.add_argument("--viewstate", type=int, default=200_000, help="synthetic __VIEWSTATE size")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        sys.exit("no pages to parse")
+    size = sum(len(p) for p in pages) / len(pages)
+    print(f"{len(pages)} pages, {size / 1024:.0f} KiB average")
+
+    results = {}
+    for engine in ("soup", "fast"):
+        outputs, rate, peak = run_engine(engine, pages, args.repeat)
+        results[engine] = outputs
+        print(f"{engine:>5}: {rate:8.1f} pages/sec   peak {peak / 1024 / 1024:7.2f} MiB")
+
+    if results["soup"] != results["fast"]:
+        for i, (a, b) in enumerate(zip(results["soup"], results["fast"]), start=1):
+            if a != b:
+                sys.exit(f"engines disagree on page {i}")
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
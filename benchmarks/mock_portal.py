@@ -0,0 +1,278 @@
+"""
+Mock eRegistration Portal
+Local stand-in for Buyer_Wise.aspx / Seller_Wise.aspx so the scraper can be
+exercised and benchmarked offline.
+
+The server follows the real request flow: the initial GET returns the form
+with ASP.NET hidden fields, the district/SRO/year dropdowns answer with
+UpdatePanel delta responses, the Search button returns the first GridView2
+page and Page$N postbacks return the others (with "..." page-group links).
+Like ASP.NET event validation, a Page$N postback is rejected unless the
+posted __EVENTVALIDATION comes from a page that links to Page$N.
+Latency, error rate and result-set size are configurable.
+
+Usage:
+    python benchmarks/mock_portal.py --port 8080 --records 500 --latency 0.05 --error-rate 0.01
+    # then point the scraper at http://127.0.0.1:8080/e_search/Buyer_Wise.aspx
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import delta_response, results_page, viewstate  # noqa: E402
+
+PATHS = {"/e_search/Buyer_Wise.aspx": "buyer", "/e_search/Seller_Wise.aspx": "seller"}
+
+
+def page_links(page, pages):
+    """Page numbers the GridView2 pager of `page` links to (same grouping as synthetic.results_page)."""
+    if pages <= 1:
+        return set()
+    group = (page - 1) // 10
+    links = set(range(group * 10 + 1, min(pages, group * 10 + 10) + 1))
+    if group:
+        links.add(group * 10)
+    if pages > group * 10 + 10:
+        links.add(group * 10 + 11)
+    links.discard(page)
+    return links
+
+
+class PortalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes: without TCP_NODELAY delayed ACKs add ~40 ms per response
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.portal.count_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        portal = self.server.portal
+        if self.path == "/_stats":
+            return self._reply(200, json.dumps(portal.snapshot()).encode(), "application/json", count=False)
+        if self.path not in PATHS:
+            return self._reply(404, b"not found")
+        if portal.delay_and_fail():
+            return self._reply(portal.error_status, b"Service Unavailable")
+        body = results_page(0, 1, 0, seed=0, hidden=portal.hidden("form"))
+        self._reply(200, body, cookie="ASP.NET_SessionId=mock%08x; path=/; HttpOnly" % random.getrandbits(32))
+
+    def do_POST(self):
+        portal = self.server.portal
+        length = int(self.headers.get("Content-Length") or 0)
+        form = dict(parse_qsl(self.rfile.read(length).decode("utf-8"), keep_blank_values=True))
+        if self.path not in PATHS:
+            return self._reply(404, b"not found")
+        if portal.delay_and_fail():
+            return self._reply(portal.error_status, b"Service Unavailable")
+
+        source = form.get("__EVENTVALIDATION", "").split(".", 1)[0]
+        if not form.get("__VIEWSTATE"):
+            return self._reply(500, b"Validation of viewstate MAC failed.")
+
+        target = form.get("__EVENTTARGET", "")
+        if form.get("__ASYNCPOST"):
+            if source != "form":
+                return self._reply(500, b"Invalid postback or callback argument.")
+            return self._reply(200, portal.dropdown_delta(target, form), "text/plain; charset=utf-8")
+
+        name = form.get("propAddress", "")
+        year = form.get("ctl00$MainContent$dd_regyear", "")
+        pages = portal.page_count(name, year)
+        if target.endswith("GridView2"):
+            page = int(form.get("__EVENTARGUMENT", "Page$1").split("$", 1)[1])
+            if not source.startswith("p") or page not in page_links(int(source[1:]), pages):
+                return self._reply(500, b"Invalid postback or callback argument.")
+        elif source != "form":
+            return self._reply(500, b"Invalid postback or callback argument.")
+        else:
+            page = 1
+        self._reply(200, portal.results(name, year, page, pages))
+
+    def _reply(self, status, body, content_type="text/html; charset=utf-8", cookie=None, count=True):
+        size = len(body)
+        if self.server.portal.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_response(status)
+            self.send_header("Content-Encoding", "gzip")
+        else:
+            self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if cookie:
+            self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+        self.wfile.write(body)
+        if count:
+            self.server.portal.count(status, size, len(body))
+
+
+class MockPortal:
+    """Threaded HTTP server imitating the portal; use as a context manager or start()/stop()."""
+
+    def __init__(self, records=100, rows_per_page=20, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, viewstate_size=20_000, seed=0, host="127.0.0.1", port=0, compress=True,
+                 sros=("01", "02", "03"), years=range(2009, 2027)):
+        """
+        records: results per search, or a callable (name_pattern, year) -> int.
+        rows_per_page: GridView2 page size.
+        latency / jitter: seconds added to every response (latency + uniform(0, jitter)).
+        error_rate: fraction of requests answered with `error_status` instead.
+        viewstate_size: __VIEWSTATE size in characters.
+        compress: gzip responses for clients that accept it (like IIS dynamic compression).
+        sros / years: options of the SRO and year dropdowns; `years` may be a callable
+        (district_id, sro_id) -> years, for SROs with partial coverage.
+        """
+        self.records = records
+        self.rows_per_page = rows_per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.viewstate_size = viewstate_size
+        self.compress = compress
+        self.sros = sros
+        self.years = years
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._blob = viewstate(viewstate_size)
+        self._validation = viewstate(4000)
+        self.stats = {"requests": 0, "errors": 0, "bytes": 0, "wire_bytes": 0, "connections": 0}
+        self.server = ThreadingHTTPServer((host, port), PortalHandler)
+        self.server.daemon_threads = True
+        self.server.portal = self
+        self._thread = None
+
+    def base_url(self, search_type="buyer"):
+        host, port = self.server.server_address[:2]
+        page = "Seller_Wise.aspx" if search_type == "seller" else "Buyer_Wise.aspx"
+        return f"http://{host}:{port}/e_search/{page}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def hidden(self, source):
+        """Hidden fields whose __EVENTVALIDATION records where the next postback comes from."""
+        return {"__VIEWSTATE": self._blob, "__EVENTVALIDATION": f"{source}.{self._validation}"}
+
+    def delay_and_fail(self):
+        """Sleep for the configured latency; True when this request should fail."""
+        with self._lock:
+            delay = self.latency + (self._rnd.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._rnd.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+    def count(self, status, size, wire_size):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += size
+            self.stats["wire_bytes"] += wire_size
+            if status >= 400:
+                self.stats["errors"] += 1
+
+    def count_connection(self):
+        with self._lock:
+            self.stats["connections"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def total_records(self, name_pattern, year):
+        return self.records(name_pattern, year) if callable(self.records) else self.records
+
+    def page_count(self, name_pattern, year):
+        return max(1, -(-self.total_records(name_pattern, year) // self.rows_per_page))
+
+    def options(self, target, form):
+        """UpdatePanel markup with the dropdown the `target` postback fills in."""
+        district = form.get("ctl00$MainContent$ddl_dis", "")
+        if target.endswith("ddl_dis"):
+            name, values = "ctl00$MainContent$ddl_sro", self.sros
+        elif target.endswith("ddl_sro"):
+            years = self.years(district, form.get("ctl00$MainContent$ddl_sro", "")) if callable(self.years) else self.years
+            name, values = "ctl00$MainContent$dd_regyear", [str(y) for y in sorted(years, reverse=True)]
+        else:
+            return "<div></div>"
+        options = "".join(f'<option value="{v}">{v}</option>' for v in values)
+        return f'<select name="{name}"><option value="0">--Select--</option>{options}</select>'
+
+    def dropdown_delta(self, target, form=None):
+        hidden = self.hidden("form")
+        return delta_response([
+            ("#", "", "4"),
+            ("updatePanel", "MainContent_UpdatePanel1", self.options(target, form or {})),
+            ("hiddenField", "__EVENTTARGET", ""),
+            ("hiddenField", "__EVENTARGUMENT", ""),
+            ("hiddenField", "__VIEWSTATE", hidden["__VIEWSTATE"]),
+            ("hiddenField", "__VIEWSTATEGENERATOR", "A1B2C3D4"),
+            ("hiddenField", "__EVENTVALIDATION", hidden["__EVENTVALIDATION"]),
+            ("asyncPostBackControlIDs", "", ""),
+            ("pageTitle", "", "Buyer Wise Search"),
+        ])
+
+    def results(self, name_pattern, year, page, pages):
+        rows = min(self.rows_per_page, self.total_records(name_pattern, year) - (page - 1) * self.rows_per_page)
+        seed = zlib.crc32(f"{name_pattern}|{year}|{page}".encode("utf-8"))
+        return results_page(page, pages, max(rows, 0), seed=seed, hidden=self.hidden(f"p{page}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="0 picks a free port")
+    parser.add_argument("--records", type=int, default=100, help="results per search")
+    parser.add_argument("--rows", type=int, default=20, help="rows per results page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 503")
+    parser.add_argument("--viewstate", type=int, default=20_000, help="__VIEWSTATE size")
+    parser.add_argument("--no-compress", action="store_true", help="never gzip responses")
+    args = parser.parse_args()
+
+    portal = MockPortal(
+        records=args.records, rows_per_page=args.rows, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, viewstate_size=args.viewstate, host=args.host, port=args.port,
+        compress=not args.no_compress,
+    )
+    # First line is machine readable: benchmark drivers read the URL from it
+    print(portal.base_url(), flush=True)
+    try:
+        portal.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        portal.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Synthetic eRegistration pages for benchmarks when no recorded pages are available.
+Mimics the real layout: large __VIEWSTATE, page chrome around GridView2 and a
+nested pager table with Page$N links.
+"""
+
+import base64
+import os
+import random
+
+VILLAGES = ["रुद्रपुर", "किच्छा", "Kashipur", "बाजपुर", "Jaspur", "खटीमा"]
+NAMES = ["राम सिंह", "श्याम लाल", "Mohan Chand", "सीता देवी", "Harish Kumar", "गीता"]
+
+
+def viewstate(size):
+    """Random base64 blob of roughly `size` characters."""
+    return base64.b64encode(os.urandom(size * 3 // 4)).decode("ascii")
+
+
+def results_page(page=1, pages=1, rows=20, viewstate_size=200_000, seed=None, hidden=None):
+    """Full results page HTML (bytes); `hidden` overrides the random __VIEWSTATE/__EVENTVALIDATION."""
+    hidden = hidden or {}
+    rnd = random.Random(seed if seed is not None else page)
+    body = []
+    for i in range(rows):
+        cells = [
+            rnd.choice(VILLAGES),
+            f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2019",
+            str(page * 1000 + i),
+            f"{rnd.randint(50, 5000)}.00",
+            f"खसरा नं. {rnd.randint(1, 999)}",
+            "विक्रय पत्र",
+            f"{rnd.randint(1, 9000)}/{rnd.randint(1, 300)}/{rnd.randint(1, 500)}",
+            f"{rnd.choice(NAMES)} पुत्र {rnd.choice(NAMES)} &amp; अन्य",
+            f"{rnd.choice(NAMES)} S/O {rnd.choice(NAMES)}",
+            rnd.choice(["पुरुष", "महिला"]),
+            "रुद्रपुर",
+            str(rnd.randint(100_000, 9_000_000)),
+            str(rnd.randint(100_000, 9_000_000)),
+        ]
+        body.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+
+    pager = ""
+    if pages > 1:
+        group = (page - 1) // 10
+        links = []
+        if group:
+            links.append(f"<td><a href=\"javascript:__doPostBack('ctl00$MainContent$GridView2','Page${group * 10}')\">...</a></td>")
+        for p in range(group * 10 + 1, min(pages, group * 10 + 10) + 1):
+            if p == page:
+                links.append(f"<td><span>{p}</span></td>")
+            else:
+                links.append(f"<td><a href=\"javascript:__doPostBack('ctl00$MainContent$GridView2','Page${p}')\">{p}</a></td>")
+        if pages > group * 10 + 10:
+            links.append(f"<td><a href=\"javascript:__doPostBack('ctl00$MainContent$GridView2','Page${group * 10 + 11}')\">...</a></td>")
+        pager = f"<tr><td colspan=\"13\"><table><tr>{''.join(links)}</tr></table></td></tr>"
+
+    header = "".join(f"<th scope=\"col\">{h}</th>" for h in ["Village", "Date", "RegNo", "Area", "Prop", "Deed", "Jild", "Seller", "Buyer", "Gender", "SRO", "Amount", "MV"])
+    chrome = "".join(f"<div class=\"nav\"><a href=\"/page{i}.aspx\">Menu {i}</a></div>" for i in range(200))
+    html = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Buyer Wise Search</title>
+<script type="text/javascript">var theForm = document.forms['form1'];</script></head>
+<body><form method="post" action="./Buyer_Wise.aspx" id="form1">
+<div class="aspNetHidden">
+<input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="" />
+<input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="" />
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{hidden.get('__VIEWSTATE') or viewstate(viewstate_size)}" />
+</div>
+<div class="aspNetHidden">
+<input type="hidden" name="__VIEWSTATEGENERATOR" id="__VIEWSTATEGENERATOR" value="A1B2C3D4" />
+<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="{hidden.get('__EVENTVALIDATION') or viewstate(4000)}" />
+</div>
+{chrome}
+<div id="MainContent_UpdatePanel1">
+<select name="ctl00$MainContent$ddl_dis" id="MainContent_ddl_dis"><option value="12" selected="selected">U S NAGAR</option></select>
+<input name="propAddress" type="text" value="राम" />
+</div>
+<div>
+<table cellspacing="0" rules="all" border="1" id="GridView2" style="border-collapse:collapse;">
+<tr>{header}</tr>
+{''.join(body)}
+{pager}
+</table>
+</div>
+</form></body></html>"""
+    return html.encode("utf-8")
+
+
+def delta_response(segments):
+    """Encode (type, id, content) segments as an UpdatePanel delta body (bytes)."""
+    out = []
+    for ptype, pid, content in segments:
+        length = len(content.encode("utf-16-le")) // 2
+        out.append(f"{length}|{ptype}|{pid}|{content}|")
+    return "".join(out).encode("utf-8")
+
+
+def postback_delta(viewstate_size=200_000, panel_rows=200):
+    """Realistic dropdown postback delta: a big UpdatePanel plus fresh hidden fields."""
+    options = "".join(f"<option value=\"{i:02d}\">{NAMES[i % len(NAMES)]} | {i}</option>" for i in range(panel_rows))
+    return delta_response([
+        ("#", "", "4"),
+        ("updatePanel", "MainContent_UpdatePanel1", f"<select name=\"ctl00$MainContent$ddl_sro\">{options}</select>"),
+        ("hiddenField", "__EVENTTARGET", ""),
+        ("hiddenField", "__EVENTARGUMENT", ""),
+        ("hiddenField", "__VIEWSTATE", viewstate(viewstate_size)),
+        ("hiddenField", "__VIEWSTATEGENERATOR", "A1B2C3D4"),
+        ("hiddenField", "__EVENTVALIDATION", viewstate(4000)),
+        ("asyncPostBackControlIDs", "", ""),
+        ("pageTitle", "", "Buyer Wise Search"),
+    ])
+
+
+FUZZ_ALPHABET = "abcXYZ019+/=|<>&\"' \n\tराम सिंह।😀🏛️"
+
+
+def random_delta(rnd, max_segments=8, max_length=64):
+    """Random delta (bytes) and the segments it encodes, for fuzzing parsers."""
+    segments = [("#", "", "4")]
+    for i in range(rnd.randint(0, max_segments)):
+        ptype = rnd.choice(["hiddenField", "updatePanel", "scriptBlock", "pageTitle"])
+        content = "".join(rnd.choice(FUZZ_ALPHABET) for _ in range(rnd.randint(0, max_length)))
+        segments.append((ptype, f"id{i}", content))
+    return delta_response(segments), segments
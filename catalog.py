@@ -0,0 +1,211 @@
+"""
+Availability Catalog
+Which SROs each district offers and which registration years each SRO has
+online, read from the ddl_sro / dd_regyear options of the portal's own
+UpdatePanel responses. Crawls record the options they see for free;
+PropertyScraperCore.scrape_options (or `python catalog.py`) refreshes a
+district explicitly. The catalog lives in a JSON file with a max age, fills
+the UI dropdowns and lets the scheduler skip (SRO, year) combinations that
+cannot return data before any request is sent.
+
+Crawls only write when the options they see differ from the stored ones (or
+an entry is getting old), under a lock file shared by every process.
+
+Usage:
+    python catalog.py --district all
+    python catalog.py --district 12,04 --path propfind_catalog.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from html.parser import HTMLParser
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, writes stay atomic
+    fcntl = None
+
+SRO_SELECT = "ctl00$MainContent$ddl_sro"
+YEAR_SELECT = "ctl00$MainContent$dd_regyear"
+
+
+class _OptionParser(HTMLParser):
+    """Collects (value, text) of the <option>s inside <select name=...>."""
+
+    def __init__(self, name):
+        super().__init__(convert_charrefs=True)
+        self.name = name
+        self.options = []
+        self._inside = False
+        self._value = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "select":
+            self._inside = attrs.get("name") == self.name or attrs.get("id") == self.name.replace("$", "_")
+        elif tag == "option" and self._inside:
+            self._value = attrs.get("value", "")
+            self.options.append([self._value, ""])
+
+    def handle_endtag(self, tag):
+        if tag == "select":
+            self._inside = False
+        elif tag == "option":
+            self._value = None
+
+    def handle_data(self, data):
+        if self._value is not None and self.options:
+            self.options[-1][1] += data
+
+
+def select_options(html, name):
+    """{value: text} of the real choices of a <select> (placeholders like '--Select--' dropped)."""
+    parser = _OptionParser(name)
+    parser.feed(html)
+    parser.close()
+    options = {}
+    for value, text in parser.options:
+        value, text = value.strip(), " ".join(text.split())
+        if not value or value in ("0", "-1") or text.startswith("-") or text.lower().startswith("select"):
+            continue
+        options[value] = text or value
+    return options
+
+
+class Catalog:
+    """JSON-file backed availability map; safe to share between threads, reloaded when another process writes it."""
+
+    def __init__(self, path="propfind_catalog.json", max_age=7 * 24 * 3600):
+        """max_age: seconds after which an entry is no longer trusted (None keeps entries forever)."""
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._data = {"sros": {}, "years": {}}
+        self._mtime = None
+
+    def _reload(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._data = {"sros": data.get("sros", {}), "years": data.get("years", {})}
+        self._mtime = mtime
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by every process writing this catalog."""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _save(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def _fresh(self, entry):
+        return entry is not None and (self.max_age is None or time.time() - entry["updated"] <= self.max_age)
+
+    def _current(self, section, key, field, value):
+        """True when the stored entry already holds `value` and is less than half its max age old."""
+        entry = self._data[section].get(key)
+        if entry is None or entry.get(field) != value:
+            return False
+        return self.max_age is None or time.time() - entry["updated"] <= self.max_age / 2
+
+    def _put(self, section, key, field, value):
+        """Store an entry unless it is already current; read-modify-write under the file lock."""
+        with self._lock:
+            self._reload()
+            if self._current(section, key, field, value):
+                return
+            with self._file_lock():
+                self._mtime = None  # re-read whatever another process wrote since
+                self._reload()
+                if self._current(section, key, field, value):
+                    return
+                self._data[section][key] = {"updated": time.time(), field: value}
+                self._save()
+
+    def observe(self, target, district_id, sro_id, raw_panels):
+        """Record the options found in an UpdatePanel response of a district or SRO postback."""
+        html = "".join(raw_panels.values()) if isinstance(raw_panels, dict) else raw_panels
+        if target == "ddl_dis":
+            sros = select_options(html, SRO_SELECT)
+            if sros:
+                self._put("sros", district_id, "sros", sros)
+        elif target == "ddl_sro":
+            years = sorted((v for v in select_options(html, YEAR_SELECT) if v.isdigit()), reverse=True)
+            if years:
+                self._put("years", f"{district_id}/{sro_id}", "years", years)
+
+    def sros(self, district_id):
+        """{sro_id: name} for a district, or None when unknown or stale."""
+        with self._lock:
+            self._reload()
+            entry = self._data["sros"].get(district_id)
+        return dict(entry["sros"]) if self._fresh(entry) else None
+
+    def years(self, district_id, sro_id):
+        """Years ("2019", newest first) the SRO has online, or None when unknown or stale."""
+        with self._lock:
+            self._reload()
+            entry = self._data["years"].get(f"{district_id}/{sro_id}")
+        return list(entry["years"]) if self._fresh(entry) else None
+
+    def prune(self, district_id, sro_id, years):
+        """Split `years` into (available, skipped); everything is available when the SRO is unknown."""
+        known = self.years(district_id, sro_id)
+        if known is None:
+            return list(years), []
+        known = set(known)
+        available = [y for y in years if str(y) in known]
+        return available, [y for y in years if str(y) not in known]
+
+
+def main(argv=None):
+    from districts import DISTRICTS
+    from scraper_core import PropertyScraperCore
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--district", default="all", help="district code(s), comma separated or 'all'")
+    parser.add_argument("--path", default="propfind_catalog.json", help="catalog file")
+    args = parser.parse_args(argv)
+
+    catalog = Catalog(args.path)
+    scraper = PropertyScraperCore(catalog=catalog)
+    districts = list(DISTRICTS) if args.district == "all" else [d.strip().zfill(2) for d in args.district.split(",")]
+    failed = 0
+    for district_id in districts:
+        for update in scraper.scrape_options(district_id):
+            if update["status"] == "error":
+                failed += 1
+                print(f"[ERROR] {district_id}: {update['message']}", file=sys.stderr)
+        sros = catalog.sros(district_id) or {}
+        years = {sro: catalog.years(district_id, sro) for sro in sros}
+        print(f"{district_id}: " + ", ".join(f"{sro} {min(y)}-{max(y)}" if y else f"{sro} -" for sro, y in years.items()))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
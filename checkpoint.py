@@ -0,0 +1,121 @@
+"""
+Crawl Checkpoints
+On-disk snapshots of an in-progress scrape_year crawl so a failed or
+interrupted crawl resumes where it stopped instead of at the initial GET.
+A checkpoint holds the last completed step, the ASP.NET hidden fields after
+it, the session cookies, the last results page number with the pending
+Page$N argument, and the records collected so far.
+
+The small step state is rewritten atomically after every step; the records
+go to a JSON-lines file with one line appended per results page, so a long
+crawl writes every record once.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+
+def _to_json(value):
+    """json.dump fallback for state values such as form_state.FormState."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def new_state():
+    """Empty crawl state (nothing completed yet)."""
+    return {"step": None, "vs": None, "cookies": {}, "page": 0, "next": None, "pages": []}
+
+
+class CheckpointStore:
+    """Per crawl key inside `directory`: a JSON state file written atomically and a JSON-lines pages file."""
+
+    def __init__(self, directory=".propfind_checkpoints", max_age=24 * 3600):
+        """max_age: seconds after which a checkpoint's form state is considered stale."""
+        self.directory = directory
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha1(json.dumps(list(key), ensure_ascii=False).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _pages_path(self, key):
+        return self._path(key)[:-len(".json")] + ".pages.jsonl"
+
+    def _load_pages(self, key, last_page):
+        """
+        [[page_num, records], ...] appended for `key`, up to the state's last page. Lines past
+        it (or torn by a crash mid-append) are dropped from the file too, before the resumed
+        crawl appends after them.
+        """
+        path = self._pages_path(key)
+        pages, dropped = [], False
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        page_num, records = json.loads(line)
+                    except ValueError:
+                        dropped = True
+                        break
+                    if page_num <= last_page:
+                        pages.append([page_num, records])
+                    else:
+                        dropped = True
+        except OSError:
+            return pages
+        if dropped:
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(page, ensure_ascii=False) + "\n" for page in pages)
+            os.replace(tmp, path)
+        return pages
+
+    def load(self, key):
+        """Return the saved state for `key`, or None when there is no usable checkpoint."""
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get("key") != list(key):
+            return None
+        if self.max_age is not None and time.time() - saved.get("saved", 0) > self.max_age:
+            self.delete(key)
+            return None
+        state = saved["state"]
+        # Pages appended after the state was last saved (a crash in between) are dropped
+        state["pages"] = self._load_pages(key, state.get("page", 0))
+        return state
+
+    def save(self, key, state):
+        """Persist the step state for `key` (temp file, then rename); its "pages" live in add_page()'s file."""
+        if not state.get("page"):
+            # No results page yet: records left by an abandoned earlier crawl do not belong to this one
+            self._remove(self._pages_path(key))
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        saved = {name: value for name, value in state.items() if name != "pages"}
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": list(key), "saved": time.time(), "state": saved}, f, ensure_ascii=False, default=_to_json)
+        os.replace(tmp, path)
+
+    def add_page(self, key, page_num, records):
+        """Append one results page's records for `key` (call before saving the state that counts it)."""
+        with open(self._pages_path(key), "a", encoding="utf-8") as f:
+            f.write(json.dumps([page_num, records], ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key):
+        """Forget the checkpoint for `key` (crawl completed)."""
+        self._remove(self._path(key))
+        self._remove(self._pages_path(key))
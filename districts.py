@@ -0,0 +1,36 @@
+"""
+District and SRO (Sub-Registrar Office) codes used by the eRegistration search forms.
+Shared by the Streamlit UI and the command-line tools.
+"""
+
+DISTRICTS = {
+    "01": "अल्मोड़ा (ALMORA)",
+    "02": "बागेश्वर (BAGESHWAR)",
+    "03": "चम्पावत (CHAMPAWAT)",
+    "04": "देहरादून (DEHRADUN)",
+    "05": "पौड़ी गढ़वाल (PAURI)",
+    "06": "चमोली (CHAMOLI)",
+    "07": "हरिद्वार (HARIDWAR)",
+    "08": "नैनीताल (NAINITAL)",
+    "09": "टिहरी गढ़वाल (TEHRI)",
+    "10": "पिथौरागढ़ (PITHORAGARH)",
+    "11": "रुद्रप्रयाग (RUDRAPRAYAG)",
+    "12": "उधम सिंह नगर (U S NAGAR)",
+    "13": "उत्तरकाशी (UTTARKASHI)",
+}
+
+SRO_BY_DISTRICT = {
+    "01": {"01": "अल्मोड़ा (ALMORA)", "02": "रानीखेत (RANIKHET)", "03": "द्वाराहाट (DWARAHAT)"},
+    "02": {"01": "बागेश्वर (BAGESHWAR)", "02": "कपकोट (KAPKOT)"},
+    "03": {"01": "चम्पावत (CHAMPAWAT)", "02": "लोहाघाट (LOHAGHAT)", "03": "टनकपुर (TANAKPUR)"},
+    "04": {"01": "देहरादून (DEHRADUN)", "02": "ऋषिकेश (RISHIKESH)", "03": "विकासनगर (VIKASNAGAR)", "04": "डोईवाला (DOIWALA)"},
+    "05": {"01": "पौड़ी (PAURI)", "02": "कोटद्वार (KOTDWAR)", "03": "श्रीनगर (SRINAGAR)"},
+    "06": {"01": "चमोली (CHAMOLI)", "02": "कर्णप्रयाग (KARNAPRAYAG)", "03": "जोशीमठ (JOSHIMATH)"},
+    "07": {"01": "हरिद्वार (HARIDWAR)", "02": "रुड़की (ROORKEE)", "03": "लक्सर (LAKSAR)"},
+    "08": {"01": "हल्द्वानी (HALDWANI)", "02": "नैनीताल (NAINITAL)", "03": "रामनगर (RAMNAGAR)", "04": "भीमताल (BHIMTAL)"},
+    "09": {"01": "टिहरी (TEHRI)", "02": "नरेंद्रनगर (NARENDRANAGAR)", "03": "घनसाली (GHANSALI)"},
+    "10": {"01": "पिथौरागढ़ (PITHORAGARH)", "02": "धारचूला (DHARCHULA)", "03": "बेरीनाग (BERINAG)"},
+    "11": {"01": "रुद्रप्रयाग (RUDRAPRAYAG)", "02": "ऊखीमठ (UKHIMATH)"},
+    "12": {"01": "बाजपुर (BAZPUR)", "02": "जसपुर (JASPUR)", "03": "काशीपुर (KASHIPUR)", "04": "खटीमा (KHATIMA)", "05": "सितारगंज (SITARGANJ)", "06": "रुद्रपुर (RUDRAPUR)"},
+    "13": {"01": "उत्तरकाशी (UTTARKASHI)", "02": "भटवाड़ी (BHATWARI)", "03": "पुरोला (PUROLA)"},
+}
@@ -0,0 +1,169 @@
+"""
+Postback Form State
+Hidden-field state of a portal session kept as bytes, and postback bodies
+assembled from pre-encoded templates.
+
+FormState holds __VIEWSTATE / __EVENTVALIDATION / __VIEWSTATEGENERATOR exactly
+as they arrive (sliced from the raw page or AJAX delta bytes, no DOM, no str
+round trip) and URL-encodes each value once, the first time a postback needs
+it. FormTemplate pre-encodes the fixed fields of a postback once per process,
+so a request body is a single bytes.join of the constant runs, the cached
+hidden fields and the few per-search values.
+"""
+
+import re
+from html import unescape
+from urllib.parse import quote_plus
+
+from ajax_delta import iter_segments
+
+HIDDEN_FIELDS = ("__VIEWSTATE", "__EVENTVALIDATION", "__VIEWSTATEGENERATOR")
+
+_INPUT_RE = re.compile(rb"<input\b[^>]*>", re.IGNORECASE)
+_ATTR_RE = re.compile(rb"""\b(id|value)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+# Bytes quote_plus leaves alone, plus the three base64 characters it escapes
+_BASE64_RE = re.compile(rb"[^A-Za-z0-9_.\-~+/=]")
+
+
+def quote_value(value):
+    """application/x-www-form-urlencoded bytes of `value` (bytes or str), as urlencode() would encode it."""
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    if _BASE64_RE.search(value) is None:
+        # ViewState/EventValidation are base64: three replaces instead of a per-byte quote
+        return value.replace(b"+", b"%2B").replace(b"/", b"%2F").replace(b"=", b"%3D")
+    return quote_plus(value, safe="").encode("ascii")
+
+
+def extract_hidden_values(raw):
+    """{name: bytes} of the hidden fields found in raw page bytes (HTML entities resolved)."""
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    data = {}
+    for tag in _INPUT_RE.finditer(raw):
+        attrs = {}
+        for m in _ATTR_RE.finditer(tag.group(0)):
+            value = m.group(2) if m.group(2) is not None else m.group(3) if m.group(3) is not None else m.group(4)
+            attrs.setdefault(m.group(1).lower(), value)
+        name = attrs.get(b"id")
+        if name is None:
+            continue
+        name = name.decode("ascii", errors="replace")
+        if name in HIDDEN_FIELDS and name not in data:
+            value = attrs.get(b"value", b"")
+            if b"&" in value:
+                value = unescape(value.decode("utf-8", errors="replace")).encode("utf-8")
+            data[name] = value
+            if len(data) == len(HIDDEN_FIELDS):
+                break
+    return data
+
+
+class FormState:
+    """ASP.NET hidden fields as bytes, with their URL-encoded forms cached."""
+
+    __slots__ = ("values", "_quoted")
+
+    def __init__(self, values=None):
+        """values: {name: bytes}."""
+        self.values = dict(values or {})
+        self._quoted = {}
+
+    @classmethod
+    def from_page(cls, raw):
+        """Hidden fields of a full page response (bytes)."""
+        return cls(extract_hidden_values(raw))
+
+    @classmethod
+    def of(cls, fields):
+        """`fields` itself when it is a FormState, else FormState.from_fields(fields)."""
+        return fields if isinstance(fields, FormState) else cls.from_fields(fields)
+
+    @classmethod
+    def from_fields(cls, fields):
+        """From a {name: str} dict (checkpoints, the BeautifulSoup engine); a FormState is copied."""
+        if isinstance(fields, FormState):
+            return fields.copy()
+        return cls({name: value.encode("utf-8") for name, value in (fields or {}).items()})
+
+    def merge_delta(self, raw):
+        """Take the hidden fields of an AJAX delta response (bytes), sliced without decoding."""
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        for ptype, pid, start, end in iter_segments(raw):
+            if ptype == "hiddenField" and pid in HIDDEN_FIELDS:
+                self.values[pid] = raw[start:end]
+                self._quoted.pop(pid, None)
+        return self
+
+    def copy(self):
+        """Independent state sharing the (immutable) values and their encodings."""
+        other = FormState(self.values)
+        other._quoted = dict(self._quoted)
+        return other
+
+    def quoted(self, name):
+        """URL-encoded value of `name` (empty when missing), encoded once."""
+        encoded = self._quoted.get(name)
+        if encoded is None:
+            encoded = self._quoted[name] = quote_value(self.values.get(name, b""))
+        return encoded
+
+    def size(self, name):
+        return len(self.values.get(name, b""))
+
+    def get(self, name, default=""):
+        """Decoded value of `name`."""
+        value = self.values.get(name)
+        return default if value is None else value.decode("utf-8", errors="replace")
+
+    def to_dict(self):
+        """{name: str}, e.g. for a JSON checkpoint."""
+        return {name: value.decode("utf-8", errors="replace") for name, value in self.values.items()}
+
+    def __eq__(self, other):
+        return isinstance(other, FormState) and self.values == other.values
+
+    def __repr__(self):
+        return "FormState(" + ", ".join(f"{name}={len(value)}B" for name, value in self.values.items()) + ")"
+
+
+class FormTemplate:
+    """
+    Form body with its fixed fields pre-encoded.
+    fields: (name, value) pairs in body order; value None marks a field filled per request,
+    from the FormState for hidden fields, otherwise from the `values` passed to render().
+    """
+
+    def __init__(self, fields):
+        self.parts = []  # bytes runs and slot names, alternating
+        run = b""
+        for i, (name, value) in enumerate(fields):
+            run += (b"&" if i else b"") + quote_value(name) + b"="
+            if value is None:
+                self.parts.append(run)
+                self.parts.append(name)
+                run = b""
+            else:
+                run += quote_value(value)
+        self.parts.append(run)
+
+    def render(self, state, values):
+        """
+        Request body (bytes) for FormState `state` and the per-request `values` ({name: value});
+        like urlencode(), values other than str/bytes are sent as str(value) and None as "".
+        """
+        body = []
+        for part in self.parts:
+            if isinstance(part, bytes):
+                body.append(part)
+            elif part in HIDDEN_FIELDS:
+                body.append(state.quoted(part))
+            else:
+                value = values.get(part)
+                if value is None:
+                    value = ""
+                elif not isinstance(value, (bytes, str)):
+                    value = str(value)
+                body.append(quote_value(value))
+        return b"".join(body)
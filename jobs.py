@@ -0,0 +1,230 @@
+"""
+Background Search Jobs
+Runs searches in a pool of worker processes instead of the Streamlit script
+thread. A search is queued as a job; a worker crawls it with ParallelScraper
+and appends every update to a shared SQLite job store, which the UI polls by
+job id. Jobs outlive script reruns and browser reloads, and server load is
+bounded by the number of workers rather than the number of open tabs.
+"""
+
+import json
+import multiprocessing
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+# queued -> running -> done | failed; cancel() moves queued/running to cancelling -> cancelled
+FINISHED = ("done", "failed", "cancelled")
+
+
+class JobStore:
+    """SQLite store of jobs and their update streams, shared by the UI and the worker processes."""
+
+    def __init__(self, path="propfind_jobs.sqlite3"):
+        self.path = path
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def create(self, params):
+        """Register a queued job; returns its id."""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs VALUES (?, ?, 'queued', '', ?, ?)",
+                (job_id, json.dumps(params, ensure_ascii=False), now, now),
+            )
+        return job_id
+
+    def params(self, job_id):
+        with self._connect() as db:
+            row = db.execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def status(self, job_id):
+        """(status, message) of a job, or None when it is unknown."""
+        with self._connect() as db:
+            return db.execute("SELECT status, message FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def set_status(self, job_id, status, message="", only_from=None):
+        """Move a job to `status`; with `only_from`, only if it is currently in one of those states."""
+        query = "UPDATE jobs SET status = ?, message = ?, updated = ? WHERE id = ?"
+        args = [status, message, time.time(), job_id]
+        if only_from:
+            query += f" AND status IN ({','.join('?' * len(only_from))})"
+            args.extend(only_from)
+        with self._connect() as db:
+            return db.execute(query, args).rowcount > 0
+
+    def cancel(self, job_id):
+        """Ask the worker to stop (a queued job is cancelled before it starts)."""
+        return self.set_status(job_id, "cancelling", only_from=("queued", "running"))
+
+    def append(self, job_id, updates):
+        """Append scrape updates to the job's stream."""
+        if not updates:
+            return
+        with self._connect() as db:
+            last = db.execute("SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE job_id = ?", (job_id,)).fetchone()[0]
+            db.executemany(
+                "INSERT INTO job_events VALUES (?, ?, ?)",
+                [(job_id, last + i, json.dumps(update, ensure_ascii=False)) for i, update in enumerate(updates, 1)],
+            )
+            db.execute("UPDATE jobs SET updated = ? WHERE id = ?", (time.time(), job_id))
+
+    def poll(self, job_id, after=0):
+        """(status, message, [(seq, update), ...]) for updates after sequence number `after`."""
+        with self._connect() as db:
+            row = db.execute("SELECT status, message FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None, "", []
+            rows = db.execute(
+                "SELECT seq, event FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+            ).fetchall()
+        return row[0], row[1], [(seq, json.loads(event)) for seq, event in rows]
+
+    def interrupt_unfinished(self):
+        """Mark jobs left queued/running by a previous server process as failed."""
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = 'failed', message = 'interrupted by a server restart', updated = ? "
+                f"WHERE status NOT IN ({','.join('?' * len(FINISHED))})",
+                (time.time(),) + FINISHED,
+            )
+
+    def purge(self, max_age=24 * 3600):
+        """Delete finished jobs (and their updates) not touched for `max_age` seconds."""
+        cutoff = time.time() - max_age
+        with self._connect() as db:
+            db.execute(
+                "DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs WHERE updated < ?)", (cutoff,)
+            )
+            db.execute("DELETE FROM jobs WHERE updated < ?", (cutoff,))
+
+
+def run_job(store_path, job_id, cache_path=None, checkpoint_dir=None, base_url=None, catalog_path=None):
+    """Worker process entry point: crawl one job and stream its updates into the store."""
+    # Imported here so the UI process does not pay for them per job
+    from catalog import Catalog
+    from checkpoint import CheckpointStore
+    from districts import DISTRICTS
+    from result_cache import ResultCache
+    from scrape_engine import ParallelScraper
+    from single_flight import SingleFlight
+    from sweep import ALL, Sweep
+
+    store = JobStore(store_path)
+    if not store.set_status(job_id, "running", only_from=("queued",)):
+        store.set_status(job_id, "cancelled", only_from=("cancelling",))
+        return
+    params = store.params(job_id)
+    engine = ParallelScraper(
+        search_type=params["search_type"],
+        cache=ResultCache(cache_path) if cache_path else None,
+        checkpoints=CheckpointStore(checkpoint_dir) if checkpoint_dir else None,
+        page_workers=params.get("page_workers", 1),
+        base_url=base_url,
+        flights=SingleFlight(store_path),
+        catalog=Catalog(catalog_path) if catalog_path else None,
+    )
+
+    if params["sro"] == ALL:
+        # District sweep: every SRO (of every district for district ALL) x year
+        districts = list(DISTRICTS) if params["district"] == ALL else [params["district"]]
+        updates = Sweep(engine).run(districts, params["years"], params["name"])
+    else:
+        updates = engine.scrape_years(params["district"], params["sro"], params["years"], params["name"])
+    try:
+        for update in updates:
+            store.append(job_id, [update])
+            if update["status"] != "info" and store.status(job_id)[0] == "cancelling":
+                updates.close()
+                store.set_status(job_id, "cancelled")
+                return
+    except Exception as e:
+        store.set_status(job_id, "failed", f"{type(e).__name__}: {e}")
+        return
+    store.set_status(job_id, "done", only_from=("running", "cancelling"))
+
+
+class JobManager:
+    """Queues jobs on a process pool (capacity = `workers`) and tracks them in a JobStore."""
+
+    def __init__(self, store=None, workers=2, cache_path=None, checkpoint_dir=None, base_url=None,
+                 catalog_path=None):
+        """
+        cache_path / checkpoint_dir: ResultCache file and CheckpointStore directory used by the workers.
+        catalog_path: availability Catalog file the workers prune with and keep up to date.
+        base_url: search page URL overriding PropertyScraperCore.URLS (e.g. a mock portal).
+        """
+        self.store = store if store is not None else JobStore()
+        self.workers = workers
+        self.cache_path = cache_path
+        self.checkpoint_dir = checkpoint_dir
+        self.base_url = base_url
+        self.catalog_path = catalog_path
+        self.store.interrupt_unfinished()
+        self.store.purge()
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        # spawn: forking the threaded Streamlit server is unsafe
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, search_type, district_id, sro_id, years, name_pattern, page_workers=1):
+        """
+        Queue a search; returns the job id to poll. sro_id sweep.ALL sweeps every SRO of the
+        district (district_id ALL: of every district) and streams "progress" updates.
+        """
+        job_id = self.store.create({
+            "search_type": search_type, "district": district_id, "sro": sro_id,
+            "years": list(years), "name": name_pattern, "page_workers": page_workers,
+        })
+        args = (run_job, self.store.path, job_id, self.cache_path, self.checkpoint_dir, self.base_url,
+                self.catalog_path)
+        try:
+            future = self._pool.submit(*args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed by the OS): start a fresh pool
+            self._pool = self._new_pool()
+            future = self._pool.submit(*args)
+        future.add_done_callback(lambda f: self._finished(job_id, f))
+        return job_id
+
+    def _finished(self, job_id, future):
+        """Fail the job if its worker raised or died before recording an outcome."""
+        error = future.exception() if not future.cancelled() else None
+        if error is not None:
+            self.store.set_status(
+                job_id, "failed", f"worker failed: {error}", only_from=("queued", "running", "cancelling")
+            )
+
+    def cancel(self, job_id):
+        return self.store.cancel(job_id)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
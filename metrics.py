@@ -0,0 +1,124 @@
+"""
+Stage Metrics
+Histograms over the per-stage timing samples PropertyScraperCore reports
+through its on_timing hook (initial GET, dropdown postbacks, search, result
+pages and throttle waits), exported as JSON or Prometheus text format.
+
+A sample is a dict: stage, district, sro, year, page, wall, network and parse
+(seconds), bytes (response bytes received, before decompression) and viewstate
+(__VIEWSTATE length).
+"""
+
+import json
+import threading
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# sample key -> (metric name, help text, buckets)
+METRICS = {
+    "wall": ("stage_wall_seconds", "Wall time of a scrape stage including retries", SECONDS_BUCKETS),
+    "network": ("stage_network_seconds", "Time waiting for the portal's response", SECONDS_BUCKETS),
+    "parse": ("stage_parse_seconds", "Time parsing the response", SECONDS_BUCKETS),
+    "bytes": ("stage_response_bytes", "Response bytes received (before decompression)", BYTES_BUCKETS),
+    "viewstate": ("stage_viewstate_bytes", "__VIEWSTATE size after the stage", BYTES_BUCKETS),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def to_dict(self):
+        return {
+            "buckets": dict(zip((str(b) for b in self.buckets), self.counts)),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class StageMetrics:
+    """
+    Callable on_timing hook aggregating samples into one histogram per metric and label set.
+    labels: sample keys used as labels, e.g. ("stage",) or ("stage", "sro", "year").
+    """
+
+    def __init__(self, labels=("stage", "sro", "year")):
+        self.labels = tuple(labels)
+        self._series = {}  # label values -> {sample key: Histogram}
+        self._lock = threading.Lock()
+
+    def __call__(self, sample):
+        self.observe(sample)
+
+    def _label_value(self, sample, label):
+        if label == "sro" and sample.get("district"):
+            return f"{sample['district']}/{sample.get('sro', '')}"
+        return str(sample.get(label, ""))
+
+    def observe(self, sample):
+        key = tuple(self._label_value(sample, label) for label in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {name: Histogram(spec[2]) for name, spec in METRICS.items()}
+            for name, histogram in series.items():
+                value = sample.get(name)
+                if value is not None:
+                    histogram.observe(value)
+
+    def to_json(self):
+        """{"labels": [...], "series": [{"labels": {...}, "<metric>": histogram}, ...]}."""
+        with self._lock:
+            series = [
+                dict({"labels": dict(zip(self.labels, key))},
+                     **{METRICS[name][0]: histogram.to_dict() for name, histogram in metrics.items()})
+                for key, metrics in sorted(self._series.items())
+            ]
+        return json.dumps({"labels": list(self.labels), "series": series}, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix="propfind"):
+        """Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            series = sorted(self._series.items())
+            for name, (metric, help_text, _) in METRICS.items():
+                full = f"{prefix}_{metric}"
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} histogram")
+                for key, metrics in series:
+                    histogram = metrics[name]
+                    if not histogram.count:
+                        continue
+                    labels = ",".join(f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key))
+                    sep = "," if labels else ""
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f'{full}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+                    lines.append(f'{full}_bucket{{{labels}{sep}le="+Inf"}} {histogram.count}')
+                    lines.append(f"{full}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{full}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write Prometheus text for *.prom / *.txt paths, JSON otherwise."""
+        text = self.to_prometheus() if path.lower().endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
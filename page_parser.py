@@ -0,0 +1,198 @@
+"""
+Fast Results Page Parser
+Single pass over a full-page POST response that extracts the GridView2 records,
+the Page$N pager links and the ASP.NET hidden fields without building a DOM for
+the whole page. Only the GridView2 table slice goes through a tokenizer; the
+hidden fields are pulled out of the raw bytes directly (as a form_state.FormState).
+Output matches PropertyScraperCore.parse_table / check_pagination / get_hidden_fields.
+"""
+
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+
+from form_state import FormState
+
+RECORD_FIELDS = (
+    "Village", "RegDate", "RegNo", "Area", "PropNo", "DeedType", "JildDetails",
+    "Seller", "Buyer", "BuyerGender", "SRO", "Amount", "MarketValue",
+)
+
+DATE_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%d-%b-%Y", "%d %b %Y", "%Y-%m-%d", "%d/%m/%Y %H:%M:%S")
+
+# Tags html.parser/BeautifulSoup treat as empty: never pushed on the open-tag stack
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "meta", "param", "source", "track", "wbr", "basefont", "bgsound",
+    "command", "frame", "image", "isindex", "nextid", "spacer",
+}
+
+_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+_TABLE_TAG_RE = re.compile(rb"<(/?)table\b", re.IGNORECASE)
+
+
+def record_from_texts(texts):
+    """Map the stripped cell texts of one GridView2 row to a record dict (None for non-data rows)."""
+    # Skip pagination rows or other non-data rows (a pager of more than 10 pages has 11+ cells,
+    # all page numbers and "..." links)
+    if len(texts) < 10 or all(not text.strip(".") or text.strip(".").isdigit() for text in texts):
+        return None
+    record = {}
+    for i, field in enumerate(RECORD_FIELDS):
+        record[field] = texts[i] if i < len(texts) else ""
+    return record
+
+
+def parse_date(text):
+    """Registration date in any of the portal's formats; None when unparseable."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def detect_charset(raw):
+    """Charset declared in the page's <meta> tag, UTF-8 when none is declared."""
+    match = _CHARSET_RE.search(raw, 0, 4096)
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def record_id(year, record, district_id=None, sro_id=None):
+    """
+    Stable record identity used for de-duplication: year + RegNo + RegDate, prefixed
+    with district and SRO when given (RegNo sequences are per SRO).
+    """
+    rid = f"{year}_{record.get('RegNo', '')}_{record.get('RegDate', '')}"
+    return rid if sro_id is None else f"{district_id}_{sro_id}_{rid}"
+
+
+def decode_page(raw, encoding="utf-8"):
+    """Decode response bytes, falling back to UTF-8 for unknown charsets."""
+    if isinstance(raw, str):
+        return raw
+    try:
+        return raw.decode(encoding, errors="replace")
+    except LookupError:
+        return raw.decode("utf-8", errors="replace")
+
+
+def extract_hidden_fields(raw):
+    """Pull __VIEWSTATE/__EVENTVALIDATION/__VIEWSTATEGENERATOR out of raw page bytes as str."""
+    return FormState.from_page(raw).to_dict()
+
+
+def locate_table(raw, table_id=b"GridView2"):
+    """Return (start, end) byte offsets of the table with `table_id`, nested tables included."""
+    marker = re.compile(rb"<table\b[^>]*\bid\s*=\s*[\"']?" + re.escape(table_id) + rb"[\"'\s>]", re.IGNORECASE)
+    match = marker.search(raw)
+    if not match:
+        return None
+    depth = 0
+    for tag in _TABLE_TAG_RE.finditer(raw, match.start()):
+        if tag.group(1):
+            depth -= 1
+            if depth == 0:
+                end = raw.find(b">", tag.end())
+                return match.start(), (end + 1 if end != -1 else len(raw))
+        else:
+            depth += 1
+    # Unterminated table: take everything to the end, like the tree builder would
+    return match.start(), len(raw)
+
+
+class _GridTableParser(HTMLParser):
+    """
+    Tokenizer for the GridView2 slice mirroring BeautifulSoup semantics:
+    every <tr> at any depth is a row, every <td> below it is a column and its
+    text is all descendant text.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.hrefs = []
+        self._stack = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for key, value in attrs:
+                if key == "href" and value:
+                    self.hrefs.append(value)
+        if tag in VOID_TAGS:
+            return
+        entry = None
+        if tag == "tr":
+            entry = []
+            self.rows.append(entry)
+        elif tag == "td":
+            entry = []
+            for open_tag, open_entry in self._stack:
+                if open_tag == "tr":
+                    open_entry.append(entry)
+        self._stack.append((tag, entry))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                del self._stack[i:]
+                return
+
+    def handle_data(self, data):
+        for open_tag, open_entry in self._stack:
+            if open_tag == "td":
+                open_entry.append(data)
+
+
+class ParsedPage:
+    """Everything the scraper needs from one results page."""
+
+    __slots__ = ("records", "hidden_fields", "hrefs")  # hidden_fields: FormState
+
+    def __init__(self, records, hidden_fields, hrefs):
+        self.records = records
+        self.hidden_fields = hidden_fields
+        self.hrefs = hrefs
+
+    def next_page(self, current_page):
+        """Return the Page$N argument for the next page if a pager link exists."""
+        next_page_arg = f"Page${current_page + 1}"
+        for href in self.hrefs:
+            if next_page_arg in href:
+                return next_page_arg
+        return None
+
+    def page_links(self):
+        """All Page$N arguments linked from the GridView2 pager."""
+        return [m.group(0) for href in self.hrefs for m in re.finditer(r"Page\$\d+", href)]
+
+
+def parse_page(raw):
+    """Parse a full results page (bytes) in a single pass."""
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    hidden_fields = FormState.from_page(raw)
+    span = locate_table(raw)
+    if span is None:
+        return ParsedPage([], hidden_fields, [])
+
+    parser = _GridTableParser()
+    parser.feed(decode_page(raw[span[0]:span[1]], detect_charset(raw)))
+    parser.close()
+
+    records = []
+    # Skip header row (index 0)
+    for row in parser.rows[1:]:
+        record = record_from_texts(["".join(cell).strip() for cell in row])
+        if record is not None:
+            records.append(record)
+    return ParsedPage(records, hidden_fields, parser.hrefs)
@@ -0,0 +1,112 @@
+"""
+Typed Record Batches
+Compact columnar representation of scraped GridView2 rows.
+Each results page becomes one Arrow table with typed columns: amounts as
+integers, RegDate as a date, and low-cardinality text (village, SRO, deed
+type, gender, year) dictionary encoded. Batches concatenate and load into
+pandas without per-row conversion (dictionary columns become categoricals).
+"""
+
+import re
+
+import pandas as pd
+import pyarrow as pa
+
+from page_parser import RECORD_FIELDS, parse_date, record_id
+
+_DIGITS_RE = re.compile(r"[^\d.\-]")
+
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema([
+    ("Year", CATEGORY),
+    ("Village", CATEGORY),
+    ("RegDate", pa.date32()),
+    ("RegNo", pa.string()),
+    ("Area", pa.string()),
+    ("PropNo", pa.string()),
+    ("DeedType", CATEGORY),
+    ("JildDetails", pa.string()),
+    ("Seller", pa.string()),
+    ("Buyer", pa.string()),
+    ("BuyerGender", CATEGORY),
+    ("SRO", CATEGORY),
+    ("Amount", pa.int64()),
+    ("MarketValue", pa.int64()),
+    ("_id", pa.string()),
+])
+
+
+def parse_amount(text):
+    """'₹ 12,34,500.00' -> 1234500; None when there is no number."""
+    if not text:
+        return None
+    cleaned = _DIGITS_RE.sub("", text)
+    if not cleaned or cleaned in ("-", "."):
+        return None
+    try:
+        return int(float(cleaned))
+    except ValueError:
+        return None
+
+
+class RecordBatch:
+    """One page of records as a typed Arrow table."""
+
+    __slots__ = ("table",)
+
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def from_records(cls, records, year, district_id=None, sro_id=None):
+        """Build a batch from parse_table dicts; `_id` is record_id() of the raw strings."""
+        columns = {field: [] for field in RECORD_FIELDS}
+        ids = []
+        for rec in records:
+            for field in RECORD_FIELDS:
+                columns[field].append(rec.get(field, ""))
+            ids.append(record_id(year, rec, district_id, sro_id))
+
+        arrays = {
+            "Year": [str(year)] * len(records),
+            "_id": ids,
+            "RegDate": [parse_date(v) for v in columns["RegDate"]],
+            "Amount": [parse_amount(v) for v in columns["Amount"]],
+            "MarketValue": [parse_amount(v) for v in columns["MarketValue"]],
+        }
+        for field in RECORD_FIELDS:
+            arrays.setdefault(field, columns[field])
+        return cls(pa.Table.from_pydict(arrays, schema=SCHEMA))
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def to_pandas(self):
+        return table_to_pandas(self.table)
+
+
+def table_to_pandas(table):
+    """Arrow -> pandas keeping nullable integers, datetimes and categoricals."""
+    return table.to_pandas(
+        types_mapper={pa.int64(): pd.Int64Dtype()}.get,
+        date_as_object=False,
+    )
+
+
+def concat_batches(batches):
+    """Concatenate batches into one Arrow table (dictionaries unified)."""
+    tables = [batch.table for batch in batches]
+    if not tables:
+        return SCHEMA.empty_table()
+    return pa.concat_tables(tables).unify_dictionaries()
+
+
+def batches_to_pandas(batches):
+    """All batches as one DataFrame, converted column-wise."""
+    return table_to_pandas(concat_batches(batches))
+
@@ -0,0 +1,282 @@
+"""
+Persistent Result Cache
+SQLite store of completed scrape_year crawls keyed by
+(search_type, district, sro, year, name_pattern).
+Closed years never change, so they are kept until evicted; the current year
+expires after a short TTL. The cache is size bounded (least recently used
+searches are evicted first) and cached pages can be replayed through the same
+status/data/done event stream scrape_year produces.
+
+Expired entries are kept (until evicted) as the baseline of an incremental
+refresh: CachedScraper.refresh_year re-crawls only until it reaches pages it
+has already stored, emits the new registrations and merges them in.
+
+The portal matches the name box (propAddress) as a case-insensitive substring
+of the buyer or seller name. A search whose normalised pattern contains a
+cached pattern for the same district/SRO/year is therefore a subset of that
+cached result and is answered by filtering it locally, without any request.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from page_parser import record_id
+from scraper_core import PropertyScraperCore
+from search_index import normalize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    search_type TEXT NOT NULL,
+    district TEXT NOT NULL,
+    sro TEXT NOT NULL,
+    year TEXT NOT NULL,
+    name_pattern TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    total INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (search_type, district, sro, year, name_pattern)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    search_type TEXT NOT NULL,
+    district TEXT NOT NULL,
+    sro TEXT NOT NULL,
+    year TEXT NOT NULL,
+    name_pattern TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (search_type, district, sro, year, name_pattern, page)
+);
+CREATE INDEX IF NOT EXISTS searches_accessed ON searches (accessed);
+"""
+
+KEY_WHERE = "search_type = ? AND district = ? AND sro = ? AND year = ? AND name_pattern = ?"
+
+# Record field the portal matches propAddress against, per search type
+MATCH_FIELD = {"buyer": "Buyer", "seller": "Seller"}
+
+
+def covers(broad, narrow):
+    """True when every portal match for `narrow` is also a match for `broad`."""
+    return normalize(broad) in normalize(narrow)
+
+
+def paginate(records, rows=20):
+    """Split records into [(page, records), ...] of `rows` records each."""
+    return [(i // rows + 1, records[i:i + rows]) for i in range(0, len(records), rows)]
+
+
+def filter_pages(pages, field, name_pattern):
+    """Keep the records of `pages` whose `field` matches `name_pattern`; empty pages are dropped."""
+    needle = normalize(name_pattern)
+    filtered = []
+    for page, records in pages:
+        kept = [rec for rec in records if needle in normalize(rec.get(field, ""))]
+        if kept:
+            filtered.append((page, kept))
+    return filtered
+
+
+class ResultCache:
+    """SQLite-backed cache of scrape_year results with TTL and size-based eviction."""
+
+    def __init__(self, path="propfind_cache.sqlite3", max_bytes=256 * 1024 * 1024,
+                 current_year_ttl=6 * 3600, closed_year_ttl=None):
+        """
+        path: SQLite database file.
+        max_bytes: upper bound on stored page data; LRU searches are evicted beyond it.
+        current_year_ttl: seconds a search for the current (still changing) year stays valid.
+        closed_year_ttl: seconds for past years; None keeps them until evicted.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.current_year_ttl = current_year_ttl
+        self.closed_year_ttl = closed_year_ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def ttl_for(self, year):
+        """TTL in seconds for a search of `year` (None = no expiry)."""
+        try:
+            closed = int(year) < date.today().year
+        except (TypeError, ValueError):
+            closed = False
+        return self.closed_year_ttl if closed else self.current_year_ttl
+
+    def get(self, search_type, district_id, sro_id, year, name_pattern):
+        """Return the cached pages [(page, records), ...] or None on a miss/expired entry."""
+        key = (search_type, district_id, sro_id, str(year), name_pattern)
+        with self._connect() as db:
+            row = db.execute(f"SELECT created FROM searches WHERE {KEY_WHERE}", key).fetchone()
+            if row is None:
+                return None
+            ttl = self.ttl_for(year)
+            if ttl is not None and time.time() - row[0] > ttl:
+                # Kept as the baseline of refresh_year until it is evicted or replaced
+                return None
+            db.execute(f"UPDATE searches SET accessed = ? WHERE {KEY_WHERE}", (time.time(),) + key)
+            rows = db.execute(f"SELECT page, data FROM pages WHERE {KEY_WHERE} ORDER BY page", key).fetchall()
+        return [(page, json.loads(data)) for page, data in rows]
+
+    def stored(self, search_type, district_id, sro_id, year, name_pattern):
+        """Stored pages of a search whatever their age, or None when it was never stored (or evicted)."""
+        key = (search_type, district_id, sro_id, str(year), name_pattern)
+        with self._connect() as db:
+            rows = db.execute(f"SELECT page, data FROM pages WHERE {KEY_WHERE} ORDER BY page", key).fetchall()
+            if not rows and db.execute(f"SELECT 1 FROM searches WHERE {KEY_WHERE}", key).fetchone() is None:
+                return None
+        return [(page, json.loads(data)) for page, data in rows]
+
+    def get_covering(self, search_type, district_id, sro_id, year, name_pattern):
+        """
+        Answer a search from a broader cached one.
+        Returns (broader_pattern, filtered pages) or None when no cached search covers it.
+        """
+        field = MATCH_FIELD.get(search_type)
+        if field is None:
+            return None
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT name_pattern, total FROM searches "
+                "WHERE search_type = ? AND district = ? AND sro = ? AND year = ? AND name_pattern != ?",
+                (search_type, district_id, sro_id, str(year), name_pattern),
+            ).fetchall()
+        # Fewest records first: the narrowest covering search is the cheapest to filter
+        for broad, _ in sorted(rows, key=lambda row: row[1]):
+            if not covers(broad, name_pattern):
+                continue
+            pages = self.get(search_type, district_id, sro_id, year, broad)
+            if pages is not None:
+                return broad, filter_pages(pages, field, name_pattern)
+        return None
+
+    def lookup(self, search_type, district_id, sro_id, year, name_pattern):
+        """Cached pages for an exact or covering search, or None when the portal must be asked."""
+        pages = self.get(search_type, district_id, sro_id, year, name_pattern)
+        if pages is not None:
+            return pages
+        covering = self.get_covering(search_type, district_id, sro_id, year, name_pattern)
+        return covering[1] if covering is not None else None
+
+    def put(self, search_type, district_id, sro_id, year, name_pattern, pages):
+        """Store a completed crawl given as [(page, records), ...]."""
+        key = (search_type, district_id, sro_id, str(year), name_pattern)
+        encoded = [(page, json.dumps(records, ensure_ascii=False)) for page, records in pages]
+        size = sum(len(data) for _, data in encoded)
+        total = sum(len(records) for _, records in pages)
+        now = time.time()
+        with self._lock, self._connect() as db:
+            self._delete(db, key)
+            db.execute(
+                "INSERT INTO searches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (now, now, total, size),
+            )
+            db.executemany(
+                "INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [key + (page, data) for page, data in encoded],
+            )
+            self._evict(db)
+
+    def _delete(self, db, key):
+        db.execute(f"DELETE FROM searches WHERE {KEY_WHERE}", key)
+        db.execute(f"DELETE FROM pages WHERE {KEY_WHERE}", key)
+
+    def _evict(self, db):
+        """Drop least recently used searches until the stored data fits in max_bytes."""
+        used = db.execute("SELECT COALESCE(SUM(size), 0) FROM searches").fetchone()[0]
+        if used <= self.max_bytes:
+            return
+        for row in db.execute(
+            "SELECT search_type, district, sro, year, name_pattern, size FROM searches ORDER BY accessed"
+        ).fetchall():
+            self._delete(db, row[:5])
+            used -= row[5]
+            if used <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remove every cached search."""
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM searches")
+            db.execute("DELETE FROM pages")
+
+
+class CachedScraper:
+    """scrape_year front end that answers from a ResultCache and fills it from completed crawls."""
+
+    def __init__(self, scraper=None, cache=None):
+        self.scraper = scraper if scraper is not None else PropertyScraperCore()
+        self.cache = cache if cache is not None else ResultCache()
+
+    def replay(self, year, pages, source=None):
+        """Generator re-emitting cached pages as scrape_year updates."""
+        if source is None:
+            yield {"status": "info", "message": f"Loaded Year {year} from cache"}
+        else:
+            yield {"status": "info", "message": f"Filtered Year {year} from cached search '{source}'"}
+        total = 0
+        for page, records in pages:
+            total += len(records)
+            yield {"status": "data", "year": year, "page": page, "count": len(records), "data": records, "cached": True}
+        yield {"status": "done", "year": year, "total": total, "cached": True}
+
+    def scrape_year(self, district_id, sro_id, year, name_pattern):
+        """Same contract as PropertyScraperCore.scrape_year, served from cache when possible."""
+        search_type = self.scraper.search_type
+        pages = self.cache.get(search_type, district_id, sro_id, year, name_pattern)
+        if pages is not None:
+            yield from self.replay(year, pages)
+            return
+        covering = self.cache.get_covering(search_type, district_id, sro_id, year, name_pattern)
+        if covering is not None:
+            yield from self.replay(year, covering[1], source=covering[0])
+            return
+
+        collected = []
+        failed = False
+        for update in self.scraper.scrape_year(district_id, sro_id, year, name_pattern):
+            if update["status"] == "data":
+                # Copy: consumers (app.py) annotate the yielded records in place
+                collected.append((update["page"], [dict(rec) for rec in update["data"]]))
+            elif update["status"] == "error":
+                failed = True
+            elif update["status"] == "done" and not failed and not update.get("shared"):
+                # A relayed crawl ("shared") is stored by the caller that ran it
+                self.cache.put(search_type, district_id, sro_id, year, name_pattern, collected)
+            yield update
+
+    def refresh_year(self, district_id, sro_id, year, name_pattern, stop_after=2):
+        """
+        Incremental re-crawl of a search stored earlier (whatever its age), for monitoring
+        the current year: only records missing from the stored result are yielded
+        (PropertyScraperCore.refresh_year), and the stored result becomes the new records
+        followed by the old ones. Without a stored result this is a full crawl.
+        """
+        search_type = self.scraper.search_type
+        stored = self.cache.stored(search_type, district_id, sro_id, year, name_pattern) or []
+        old = [rec for _, records in stored for rec in records]
+        rows = max((len(records) for _, records in stored), default=20)
+        known = {record_id(year, rec) for rec in old}
+
+        fresh = []
+        failed = False
+        for update in self.scraper.refresh_year(district_id, sro_id, year, name_pattern, known, stop_after):
+            if update["status"] == "data":
+                fresh.extend(dict(rec) for rec in update["data"])
+            elif update["status"] == "error":
+                failed = True
+            elif update["status"] == "done" and not failed:
+                self.cache.put(search_type, district_id, sro_id, year, name_pattern, paginate(fresh + old, rows))
+            yield update
@@ -0,0 +1,98 @@
+"""
+Results View State
+Session-side state the results table and the clipboard keep across Streamlit
+reruns, so a rerun only redoes the work its change requires.
+
+PageCache keeps the prepared DataFrames (columns selected, Save column
+added) of recently shown result pages; a page is rebuilt only when the rows it
+covers change. Clipboard keeps saved records keyed by _id, so saving or
+unsaving rows costs time proportional to the rows ticked, and builds its
+DataFrame and CSV once per change instead of on every rerun.
+"""
+
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class PageCache:
+    """LRU of prepared page DataFrames keyed by whatever identifies the rows of the page."""
+
+    def __init__(self, max_pages=8):
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+
+    def get(self, key, build):
+        """The DataFrame cached for `key`, built with build() on a miss."""
+        df = self._pages.get(key)
+        if df is None:
+            df = self._pages[key] = build()
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(key)
+        return df
+
+
+class Clipboard:
+    """Saved records keyed by _id, in the order they were saved."""
+
+    def __init__(self):
+        self._records = {}
+        self.generation = 0  # bumped by clear(), e.g. to start editors showing saved rows afresh
+        self._frame = None
+        self._pending = []  # records added since _frame was built
+        self._csv = None
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, record_id):
+        return record_id in self._records
+
+    @property
+    def ids(self):
+        """Live view of the saved ids (for Series.isin)."""
+        return self._records.keys()
+
+    def add(self, records):
+        """Save records (dicts with an "_id") not saved yet; returns how many were added."""
+        added = 0
+        for record in records:
+            record_id = record.get("_id")
+            if record_id not in self._records:
+                self._records[record_id] = record
+                self._pending.append(record)
+                added += 1
+        if added:
+            self._csv = None
+        return added
+
+    def remove(self, record_ids):
+        """Unsave records by id; returns how many were removed."""
+        removed = sum(self._records.pop(record_id, None) is not None for record_id in record_ids)
+        if removed:
+            # Rebuilt from the remaining records on the next frame()
+            self._frame, self._pending, self._csv = None, [], None
+        return removed
+
+    def clear(self):
+        self._records.clear()
+        self.generation += 1
+        self._frame, self._pending, self._csv = None, [], None
+
+    def frame(self):
+        """Saved records as a DataFrame, extended with the records added since the last call."""
+        if self._frame is None:
+            self._frame = pd.DataFrame(list(self._records.values()))
+            self._pending = []
+        elif self._pending:
+            self._frame = pd.concat([self._frame, pd.DataFrame(self._pending)], ignore_index=True)
+            self._pending = []
+        return self._frame
+
+    def csv(self):
+        """UTF-8 CSV of the saved records, encoded once per change."""
+        if self._csv is None:
+            self._csv = self.frame().to_csv(index=False).encode("utf-8")
+        return self._csv
@@ -0,0 +1,151 @@
+"""
+Parallel Scrape Engine
+Runs PropertyScraperCore.scrape_year for several years on a bounded worker pool.
+Every worker keeps its own requests.Session (one per year, as before) while all
+of them share a single per-host rate limit so the portal is not overloaded.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from result_cache import CachedScraper
+from scraper_core import PropertyScraperCore
+from single_flight import SingleFlightScraper
+from throttle import AdaptiveThrottle
+
+
+class RateLimiter:
+    """Thread-safe per-host politeness budget: at most one request every `min_interval` seconds per host."""
+
+    def __init__(self, min_interval=0.5):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host=""):
+        """Block until the caller may send its next request to `host`."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+_FINISHED = object()
+
+
+def _drain(tags, factory, events, stop):
+    """Worker body: drive one generator and forward its updates tagged with `tags`."""
+    try:
+        for update in factory():
+            if stop.is_set():
+                return
+            for key, value in tags.items():
+                update.setdefault(key, value)
+            events.put(update)
+    except Exception as e:
+        events.put({"status": "error", **tags, "message": f"Worker failed: {str(e)}"})
+        events.put({"status": "done", **tags, "total": 0})
+    finally:
+        events.put(_FINISHED)
+
+
+def merge_streams(streams, max_workers=4):
+    """
+    Run update generators on a bounded thread pool and yield their updates as they arrive.
+    streams: iterable of (tags, factory) where factory() returns a scrape_year-style
+    generator and tags (e.g. {"year": "2019"}) are added to every update it yields.
+    """
+    streams = list(streams)
+    if not streams:
+        return
+
+    events = queue.Queue()
+    stop = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(streams))))
+    try:
+        for tags, factory in streams:
+            pool.submit(_drain, tags, factory, events, stop)
+
+        remaining = len(streams)
+        while remaining:
+            update = events.get()
+            if update is _FINISHED:
+                remaining -= 1
+                continue
+            yield update
+    finally:
+        # Consumer stopped early (or we finished): let idle workers bail out
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ParallelScraper:
+    """Concurrent driver around scrape_year that merges all workers into one event stream."""
+
+    def __init__(self, search_type="buyer", max_workers=4, rate_limiter=None, throttle=None, cache=None,
+                 checkpoints=None, page_workers=1, base_url=None, on_timing=None, flights=None,
+                 transport=None, catalog=None):
+        """
+        cache: optional ResultCache; cached years are replayed instead of crawled.
+        checkpoints: optional CheckpointStore; failed/interrupted years resume from it.
+        page_workers: results pages of one year fetched concurrently (1 = one after another).
+        base_url: search page URL overriding PropertyScraperCore.URLS.
+        on_timing: optional per-stage timing hook shared by every worker (e.g. metrics.StageMetrics).
+        flights: optional single_flight.SingleFlight; a year already being crawled elsewhere is joined.
+        transport: transport.Transport shared by the workers (defaults to the process-wide pool).
+        catalog: optional catalog.Catalog; years the SRO does not offer are skipped without a request,
+        and the crawls keep the catalog up to date with the options they see.
+        """
+        self.search_type = search_type.lower()
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        # One throttle for all workers: they all observe the same portal's health
+        self.throttle = throttle if throttle is not None else AdaptiveThrottle()
+        self.cache = cache
+        self.checkpoints = checkpoints
+        self.page_workers = page_workers
+        self.base_url = base_url
+        self.on_timing = on_timing
+        self.flights = flights
+        self.transport = transport
+        self.catalog = catalog
+
+    def core(self):
+        """A PropertyScraperCore wired to the shared rate limit, throttle and checkpoints."""
+        return PropertyScraperCore(
+            search_type=self.search_type, rate_limiter=self.rate_limiter, throttle=self.throttle,
+            checkpoints=self.checkpoints, page_workers=self.page_workers, base_url=self.base_url,
+            on_timing=self.on_timing, transport=self.transport, catalog=self.catalog,
+        )
+
+    def year_stream(self, district_id, sro_id, year, name_pattern):
+        """scrape_year updates of one year through the engine's single-flight and cache layers."""
+        scraper = self.core()
+        if self.flights is not None:
+            scraper = SingleFlightScraper(scraper, self.flights)
+        if self.cache is not None:
+            scraper = CachedScraper(scraper, self.cache)
+        return scraper.scrape_year(district_id, sro_id, year, name_pattern)
+
+    def scrape_years(self, district_id, sro_id, years, name_pattern):
+        """
+        Generator that scrapes all `years` concurrently.
+        Yields the same status/data/done updates as scrape_year, in arrival order,
+        each tagged with the year it belongs to. Years the catalog rules out
+        get an info update and a zero "done" with "skipped": True.
+        """
+        if self.catalog is not None:
+            years, skipped = self.catalog.prune(district_id, sro_id, years)
+            for year in skipped:
+                yield {"status": "info", "year": year, "message": f"Year {year}: not available for this SRO, skipped"}
+                yield {"status": "done", "year": year, "total": 0, "skipped": True}
+        streams = [
+            ({"year": year}, lambda year=year: self.year_stream(district_id, sro_id, year, name_pattern))
+            for year in years
+        ]
+        yield from merge_streams(streams, self.max_workers)
@@ -8,19 +8,96 @@ import requests
 from bs4 import BeautifulSoup
 import time
 import re
+import functools
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
 
+from ajax_delta import parse_delta
+from checkpoint import new_state
+from form_state import FormState, FormTemplate
+from page_parser import ParsedPage, parse_date, parse_page, record_from_texts, record_id
+from throttle import AdaptiveThrottle, retry_after_seconds
+from transport import default_transport
 
-class PropertyScraperCore:
+# Postback bodies: fixed fields are encoded once; hidden fields and the
+# per-search values (None below) are spliced in per request
+FORM_FIELDS = (
+    ("__VIEWSTATE", None),
+    ("__VIEWSTATEGENERATOR", None),
+    ("__EVENTVALIDATION", None),
+    ("ctl00$MainContent$ddl_dis", None),
+    ("ctl00$MainContent$ddl_sro", None),
+    ("ctl00$MainContent$dd_regyear", None),
+)
+
+SEARCH_FORM = FormTemplate(
+    [("__EVENTTARGET", ""), ("__EVENTARGUMENT", ""), ("__LASTFOCUS", "")]
+    + list(FORM_FIELDS)
+    + [("propAddress", None), ("ctl00$MainContent$btn_prcd", "Search")]
+)
+
+PAGINATION_FORM = FormTemplate(
+    [("__EVENTTARGET", "ctl00$MainContent$GridView2"), ("__EVENTARGUMENT", None), ("__LASTFOCUS", "")]
+    + list(FORM_FIELDS)
+    + [("propAddress", None)]
+)
+
+
+@functools.lru_cache(maxsize=None)
+def dropdown_form(target):
+    """FormTemplate of the UpdatePanel postback fired by the `target` dropdown."""
+    return FormTemplate(
+        [
+            ("ctl00$ScriptManager1", f"ctl00$MainContent$UpdatePanel1|ctl00$MainContent${target}"),
+            ("__EVENTTARGET", f"ctl00$MainContent${target}"),
+            ("__EVENTARGUMENT", ""),
+            ("__LASTFOCUS", ""),
+        ]
+        + list(FORM_FIELDS)
+        + [("propAddress", ""), ("__ASYNCPOST", "true")]
+    )
+
+
+def form_values(district_id, sro_id, year, name_pattern=None, argument=None):
+    """Per-request values of a postback body."""
+    return {
+        "ctl00$MainContent$ddl_dis": district_id,
+        "ctl00$MainContent$ddl_sro": sro_id,
+        "ctl00$MainContent$dd_regyear": year,
+        "propAddress": name_pattern,
+        "__EVENTARGUMENT": argument,
+    }
+
+
+def wire_bytes(r):
+    """Bytes of response `r` received from the portal, before gzip etc. was decoded."""
+    try:
+        return r.raw.tell()
+    except AttributeError:
+        return len(r.content)
+
+
+class PortalForms:
+    """
+    Postback payloads and response parsing of the search page, shared by the sync
+    crawler (PropertyScraperCore) and async_scraper.AsyncPropertyScraper.
+    """
     # URLs for different search types
     URLS = {
         "buyer": "https://online.eregistrationukgov.in/e_search/Buyer_Wise.aspx",
         "seller": "https://online.eregistrationukgov.in/e_search/Seller_Wise.aspx",
     }
     
-    def __init__(self, search_type="buyer"):
-        """Initialize scraper with search type ('buyer' or 'seller')."""
+    def __init__(self, search_type="buyer", parser="fast", base_url=None):
+        """
+        search_type: 'buyer' or 'seller'.
+        parser: results page engine, "fast" (page_parser) or "soup" (BeautifulSoup html.parser).
+        base_url: search page URL overriding URLS (e.g. a local mock portal).
+        """
         self.search_type = search_type.lower()
-        self.base_url = self.URLS.get(self.search_type, self.URLS["buyer"])
+        self.base_url = base_url or self.URLS.get(self.search_type, self.URLS["buyer"])
+        self.parser = parser
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -31,6 +108,9 @@ class PropertyScraperCore:
             "X-MicrosoftAjax": "Delta=true",
             "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
         }
+        self.form_headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
 
     def get_hidden_fields(self, soup):
         """Extract ASP.NET hidden fields from the page."""
@@ -42,26 +122,8 @@ class PropertyScraperCore:
         return data
 
     def parse_ajax_response(self, text):
-        """Parse ASP.NET AJAX UpdatePanel response format."""
-        parts = text.split('|')
-        result = {}
-        i = 0
-        while i < len(parts) - 3:
-            try:
-                length = int(parts[i])
-                ptype = parts[i+1]
-                pid = parts[i+2]
-                content = parts[i+3]
-                
-                if ptype == 'hiddenField':
-                    result[pid] = content
-                elif ptype == 'updatePanel':
-                    result[f"panel_{pid}"] = content
-                    
-                i += 4
-            except (ValueError, IndexError):
-                i += 1
-        return result
+        """Parse ASP.NET AJAX UpdatePanel response format (hidden fields and panels)."""
+        return parse_delta(text, types=("hiddenField", "updatePanel"))
 
     def parse_table(self, soup):
         """Parse the GridView2 table and extract records."""
@@ -76,31 +138,9 @@ class PropertyScraperCore:
             
         # Skip header row (index 0)
         for row in rows[1:]:
-            cols = row.find_all("td")
-            
-            # Skip pagination rows or other non-data rows
-            if len(cols) < 10:
-                continue
-                
-            try:
-                record = {
-                    "Village": cols[0].text.strip(),
-                    "RegDate": cols[1].text.strip(),
-                    "RegNo": cols[2].text.strip(),
-                    "Area": cols[3].text.strip(),
-                    "PropNo": cols[4].text.strip(),
-                    "DeedType": cols[5].text.strip(),
-                    "JildDetails": cols[6].text.strip(),
-                    "Seller": cols[7].text.strip(),
-                    "Buyer": cols[8].text.strip(),
-                    "BuyerGender": cols[9].text.strip() if len(cols) > 9 else "",
-                    "SRO": cols[10].text.strip() if len(cols) > 10 else "",
-                    "Amount": cols[11].text.strip() if len(cols) > 11 else "",
-                    "MarketValue": cols[12].text.strip() if len(cols) > 12 else ""
-                }
+            record = record_from_texts([col.text.strip() for col in row.find_all("td")])
+            if record is not None:
                 results.append(record)
-            except (IndexError, AttributeError) as e:
-                continue
                 
         return results
 
@@ -121,189 +161,543 @@ class PropertyScraperCore:
             return next_page_arg
         return None
 
-    def scrape_year(self, district_id, sro_id, year, name_pattern):
+    def parse_page(self, content):
+        """Parse a full results page (records, hidden fields, pager links) with the configured engine."""
+        if self.parser == "soup":
+            soup = BeautifulSoup(content, "html.parser")
+            table = soup.find("table", {"id": "GridView2"})
+            hrefs = [a["href"] for a in table.find_all("a", href=True)] if table else []
+            return ParsedPage(self.parse_table(soup), FormState.from_fields(self.get_hidden_fields(soup)), hrefs)
+        return parse_page(content)
+
+    def page_hidden_fields(self, content):
+        """Hidden fields (FormState) of a full page response with the configured engine."""
+        if self.parser == "soup":
+            return FormState.from_fields(self.get_hidden_fields(BeautifulSoup(content, "html.parser")))
+        return FormState.from_page(content)
+
+    def build_dropdown_payload(self, vs, target, district_id, sro_id="", year=""):
+        """Build the AJAX (UpdatePanel) postback body (bytes) for a dropdown change."""
+        return dropdown_form(target).render(FormState.of(vs), form_values(district_id, sro_id, year))
+
+    def build_search_payload(self, vs, district_id, sro_id, year, name_pattern):
+        """Build the full page POST body (bytes) for the Search button."""
+        return SEARCH_FORM.render(FormState.of(vs), form_values(district_id, sro_id, year, name_pattern))
+
+    def build_pagination_payload(self, vs, page_arg, district_id, sro_id, year, name_pattern):
+        """Build the full page POST body (bytes) for a GridView2 Page$N postback."""
+        return PAGINATION_FORM.render(FormState.of(vs), form_values(district_id, sro_id, year, name_pattern, page_arg))
+
+    def merge_ajax_fields(self, vs, raw):
+        """Update the hidden fields of FormState `vs` from an AJAX delta response (bytes or text)."""
+        return vs.merge_delta(raw)
+
+
+class PropertyScraperCore(PortalForms):
+    def __init__(self, search_type="buyer", rate_limiter=None, throttle=None, parser="fast",
+                 checkpoints=None, max_retries=3, retry_backoff=2.0, page_workers=1, base_url=None,
+                 on_timing=None, transport=None, catalog=None):
         """
-        Generator that scrapes data for a single year.
-        Yields status updates and data as it progresses.
+        Initialize scraper with search type ('buyer' or 'seller').
+        rate_limiter: optional shared RateLimiter consulted before every request.
+        throttle: delay controller between steps (defaults to an AdaptiveThrottle).
+        parser: results page engine, "fast" (page_parser) or "soup" (BeautifulSoup html.parser).
+        checkpoints: optional CheckpointStore; scrape_year then resumes interrupted crawls.
+        max_retries / retry_backoff: retries of a failed step (network error, 429/5xx),
+        waiting retry_backoff * 2**attempt seconds between attempts.
+        page_workers: results pages fetched at once; above 1, every Page$N link (including
+        the "..." page-group links) is posted from the ViewState of the page that shows it.
+        base_url: search page URL overriding URLS (e.g. a local mock portal).
+        on_timing: optional callable receiving a sample dict per stage and page (see metrics.py):
+        wall/network/parse seconds, response bytes received (compressed) and __VIEWSTATE size.
+        transport: transport.Transport whose keep-alive pool the crawls share
+        (defaults to the process-wide one); each crawl keeps its own cookies.
+        catalog: optional catalog.Catalog recording the SRO/year options the dropdown postbacks return.
         """
-        results = []
-        
-        # CRITICAL: Fresh session per year
-        with requests.Session() as s:
-            s.headers.update(self.headers)
-            
-            yield {"status": "info", "message": f"Starting session for Year {year}..."}
-            
-            # 1. Initial GET
+        super().__init__(search_type=search_type, parser=parser, base_url=base_url)
+        self.rate_limiter = rate_limiter
+        self.throttle = throttle if throttle is not None else AdaptiveThrottle()
+        self.checkpoints = checkpoints
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.page_workers = page_workers
+        self.on_timing = on_timing
+        self.transport = transport if transport is not None else default_transport()
+        self.catalog = catalog
+        self._pace_lock = threading.Lock()
+
+    def _send(self, s, method, **kwargs):
+        """Issue a request to the search page, waiting for the shared rate limit first."""
+        kwargs.setdefault("timeout", self.transport.timeout)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(urlparse(self.base_url).netloc)
+        started = time.monotonic()
+        try:
+            r = s.request(method, self.base_url, **kwargs)
+        except Exception:
+            self.throttle.record(time.monotonic() - started, error=True)
+            raise
+        r.network_time = time.monotonic() - started
+        self.throttle.record(r.network_time, status=r.status_code, retry_after=retry_after_seconds(r.headers))
+        return r
+
+    def _timing(self, stage, where, started, parse_started, r, vs, page=None):
+        """Report a finished stage to the on_timing hook; `where` is (district, sro, year)."""
+        if self.on_timing is None:
+            return
+        now = time.monotonic()
+        self.on_timing({
+            "stage": stage, "district": where[0], "sro": where[1], "year": str(where[2]), "page": page,
+            "wall": now - started, "network": getattr(r, "network_time", 0.0), "parse": now - parse_started,
+            "bytes": wire_bytes(r), "viewstate": vs.size("__VIEWSTATE"),
+        })
+
+    def _pause(self, where):
+        """throttle.wait(), reported to the on_timing hook as a "wait" stage."""
+        started = time.monotonic()
+        self.throttle.wait()
+        if self.on_timing is not None:
+            self.on_timing({
+                "stage": "wait", "district": where[0], "sro": where[1], "year": str(where[2]), "page": None,
+                "wall": time.monotonic() - started,
+            })
+
+    def _attempt(self, label, s, method, **kwargs):
+        """
+        Generator sending one request, retrying transient failures (network errors,
+        429/5xx) from the same form state with exponential backoff.
+        Yields retry notices; returns the response or raises the last error.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                r = self._send(s, method, **kwargs)
+                if r.status_code == 429 or r.status_code >= 500:
+                    raise requests.HTTPError(f"HTTP {r.status_code}", response=r)
+                return r
+            except requests.RequestException as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                yield {"status": "info", "message": f"{label} failed ({str(e)}), retrying in {delay:.0f}s..."}
+                time.sleep(delay)
+
+    def _checkpoint(self, key, state, s, **changes):
+        """Record progress in `state` and persist it when checkpointing is enabled."""
+        state.update(changes)
+        if self.checkpoints is not None and key is not None:
+            state["cookies"] = s.cookies.get_dict()
+            self.checkpoints.save(key, state)
+
+    def _observe_options(self, target, district_id, sro_id, r):
+        """Pass the dropdown options of a district/SRO postback response to the catalog."""
+        if self.catalog is None or target == "dd_regyear":
+            return
+        try:
+            self.catalog.observe(target, district_id, sro_id, parse_delta(r.content, types=("updatePanel",)))
+        except Exception:
+            # The catalog is an optimisation; never fail a crawl over it
+            pass
+
+    def _select_form(self, s, district_id, sro_id, year, state, key=None):
+        """
+        Generator running the initial GET and the district/SRO/year AJAX postbacks,
+        skipping steps `state` already completed (resumed crawl).
+        Yields status updates; returns the resulting hidden fields, or None on failure.
+        """
+        where = (district_id, sro_id, year)
+
+        # 1. Initial GET
+        if state["step"] is None:
             try:
-                r = s.get(self.base_url, timeout=60)
-                soup = BeautifulSoup(r.content, "html.parser")
-                vs = self.get_hidden_fields(soup)
+                started = time.monotonic()
+                r = yield from self._attempt("Initial load", s, "GET")
+                parse_started = time.monotonic()
+                vs = self.page_hidden_fields(r.content)
+                self._timing("initial", where, started, parse_started, r, vs)
             except Exception as e:
                 yield {"status": "error", "message": f"Initial load failed: {str(e)}"}
-                return
+                return None
 
-            time.sleep(2)
+            self._checkpoint(key, state, s, step="initial", vs=vs)
+            self._pause(where)
+
+        vs = FormState.from_fields(state["vs"])
+
+        # 2-4. Select District, SRO and Year (AJAX postbacks)
+        steps = [
+            ("district", "District", "ddl_dis", (district_id,)),
+            ("sro", "SRO", "ddl_sro", (district_id, sro_id)),
+            ("year", "Year", "dd_regyear", (district_id, sro_id, year)),
+        ]
+        order = [step for step, _, _, _ in steps]
+        if state["step"] == "page":
+            completed = len(steps)
+        else:
+            completed = order.index(state["step"]) + 1 if state["step"] in order else 0
+        for step, label, target, args in steps[completed:]:
+            yield {"status": "info", "message": f"Selecting {label} {args[-1]}..."}
 
-            # 2. Select District (AJAX postback)
-            yield {"status": "info", "message": f"Selecting District {district_id}..."}
-            
-            s.headers.update(self.ajax_headers)
-            
-            payload = {
-                "ctl00$ScriptManager1": "ctl00$MainContent$UpdatePanel1|ctl00$MainContent$ddl_dis",
-                "__EVENTTARGET": "ctl00$MainContent$ddl_dis",
-                "__EVENTARGUMENT": "",
-                "__LASTFOCUS": "",
-                "__VIEWSTATE": vs.get("__VIEWSTATE", ""),
-                "__VIEWSTATEGENERATOR": vs.get("__VIEWSTATEGENERATOR", ""),
-                "__EVENTVALIDATION": vs.get("__EVENTVALIDATION", ""),
-                "ctl00$MainContent$ddl_dis": district_id,
-                "ctl00$MainContent$ddl_sro": "",
-                "ctl00$MainContent$dd_regyear": "",
-                "propAddress": "",
-                "__ASYNCPOST": "true",
-            }
-            
             try:
-                r = s.post(self.base_url, data=payload, timeout=60)
-                ajax_result = self.parse_ajax_response(r.text)
-                for key in ["__VIEWSTATE", "__EVENTVALIDATION", "__VIEWSTATEGENERATOR"]:
-                    if key in ajax_result:
-                        vs[key] = ajax_result[key]
+                payload = self.build_dropdown_payload(vs, target, *args)
+                started = time.monotonic()
+                r = yield from self._attempt(
+                    f"{label} selection", s, "POST", data=payload, headers=self.ajax_headers
+                )
+                parse_started = time.monotonic()
+                self.merge_ajax_fields(vs, r.content)
+                self._timing(step, where, started, parse_started, r, vs)
+                self._observe_options(target, district_id, sro_id, r)
             except Exception as e:
-                yield {"status": "error", "message": f"District selection failed: {str(e)}"}
-                return
+                yield {"status": "error", "message": f"{label} selection failed: {str(e)}"}
+                return None
 
-            time.sleep(2)
+            self._checkpoint(key, state, s, step=step, vs=vs.copy())
+            self._pause(where)
 
-            # 3. Select SRO (AJAX postback)
-            yield {"status": "info", "message": f"Selecting SRO {sro_id}..."}
-            
-            payload.update({
-                "ctl00$ScriptManager1": "ctl00$MainContent$UpdatePanel1|ctl00$MainContent$ddl_sro",
-                "__EVENTTARGET": "ctl00$MainContent$ddl_sro",
-                "__VIEWSTATE": vs.get("__VIEWSTATE", ""),
-                "__EVENTVALIDATION": vs.get("__EVENTVALIDATION", ""),
-                "ctl00$MainContent$ddl_dis": district_id,
-                "ctl00$MainContent$ddl_sro": sro_id,
-            })
+        return vs
+
+    def _emit_page(self, s, page, page_num, year, state, key=None):
+        """Checkpoint a parsed results page and yield its data update; returns the next Page$N or None."""
+        records = page.records
+        next_page_arg = page.next_page(page_num)
+        if self.checkpoints is not None and key is not None:
+            self.checkpoints.add_page(key, page_num, records)
+        self._checkpoint(key, state, s, step="page", vs=page.hidden_fields, page=page_num, next=next_page_arg)
+
+        yield {
+            "status": "data", 
+            "year": year, 
+            "page": page_num, 
+            "count": len(records), 
+            "data": records,
+            "rate": self.throttle.rate(),
+        }
+        return next_page_arg
 
+    def _fetch_page(self, s, vs, page_arg, district_id, sro_id, year, name_pattern):
+        """Worker: post one Page$N from hidden fields `vs`; returns (parsed page, retry notices)."""
+        where = (district_id, sro_id, year)
+        payload = self.build_pagination_payload(vs, page_arg, district_id, sro_id, year, name_pattern)
+        # The throttle's pause (backoff, Retry-After) spaces the page workers' request starts;
+        # a shared rate limiter is waited for on top of it, in _send
+        with self._pace_lock:
+            self._pause(where)
+        started = time.monotonic()
+        attempt = self._attempt("Pagination", s, "POST", data=payload, headers=self.form_headers)
+        notices = []
+        while True:
             try:
-                r = s.post(self.base_url, data=payload, timeout=60)
-                ajax_result = self.parse_ajax_response(r.text)
-                for key in ["__VIEWSTATE", "__EVENTVALIDATION", "__VIEWSTATEGENERATOR"]:
-                    if key in ajax_result:
-                        vs[key] = ajax_result[key]
-            except Exception as e:
-                yield {"status": "error", "message": f"SRO selection failed: {str(e)}"}
-                return
+                notices.append(next(attempt))
+            except StopIteration as stop:
+                r = stop.value
+                break
+        parse_started = time.monotonic()
+        page = self.parse_page(r.content)
+        self._timing("page", where, started, parse_started, r, page.hidden_fields, int(page_arg.split("$", 1)[1]))
+        return page, notices
+
+    def _fetch_pages(self, s, first, district_id, sro_id, year, name_pattern, state, key=None):
+        """
+        Generator fetching the pages after `first` concurrently. ViewState is client side, so
+        every Page$N linked from a page (the "..." group links too) is posted from that page's
+        hidden fields as soon as it is discovered. Data updates are emitted in page order.
+        Returns the record count of the pages fetched.
+        """
+        total = 0
+        pending = {}  # future -> page number
+        fetched = {}  # page number -> ParsedPage, waiting for the pages before it
+        seen = {1}
+        next_num = 2
 
-            time.sleep(2)
+        with ThreadPoolExecutor(max_workers=self.page_workers) as pool:
+            def discover(page):
+                for page_arg in page.page_links():
+                    num = int(page_arg.split("$", 1)[1])
+                    if num not in seen:
+                        seen.add(num)
+                        future = pool.submit(
+                            self._fetch_page, s, page.hidden_fields, page_arg, district_id, sro_id, year, name_pattern
+                        )
+                        pending[future] = num
 
-            # 4. Select Year (AJAX postback)
-            yield {"status": "info", "message": f"Selecting Year {year}..."}
-            
-            payload.update({
-                "ctl00$ScriptManager1": "ctl00$MainContent$UpdatePanel1|ctl00$MainContent$dd_regyear",
-                "__EVENTTARGET": "ctl00$MainContent$dd_regyear",
-                "__VIEWSTATE": vs.get("__VIEWSTATE", ""),
-                "__EVENTVALIDATION": vs.get("__EVENTVALIDATION", ""),
-                "ctl00$MainContent$dd_regyear": year,
-            })
-            
+            discover(first)
             try:
-                r = s.post(self.base_url, data=payload, timeout=60)
-                ajax_result = self.parse_ajax_response(r.text)
-                for key in ["__VIEWSTATE", "__EVENTVALIDATION", "__VIEWSTATEGENERATOR"]:
-                    if key in ajax_result:
-                        vs[key] = ajax_result[key]
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        num = pending.pop(future)
+                        page, notices = future.result()
+                        yield from notices
+                        fetched[num] = page
+                        discover(page)
+                    while next_num in fetched:
+                        page = fetched.pop(next_num)
+                        total += len(page.records)
+                        yield from self._emit_page(s, page, next_num, year, state, key)
+                        next_num += 1
             except Exception as e:
-                yield {"status": "error", "message": f"Year selection failed: {str(e)}"}
-                return
+                failure = e
+            else:
+                failure = None
+            finally:
+                # Also when the generator is closed: leaving the pool would otherwise wait
+                # for every queued page fetch (and its throttle pause)
+                for future in pending:
+                    future.cancel()
+        if failure is not None:
+            yield {"status": "error", "message": f"Pagination failed: {str(failure)}"}
+            return total
+
+        # Pages past a gap in the pager numbering
+        for num in sorted(fetched):
+            total += len(fetched[num].records)
+            yield from self._emit_page(s, fetched[num], num, year, state, key)
+        state["complete"] = True
+        return total
 
-            time.sleep(2)
+    def _search_pages(self, s, vs, district_id, sro_id, year, name_pattern, state, key=None):
+        """
+        Generator running the search POST and the pagination loop from hidden fields `vs`.
+        A resumed crawl (state at a results page) replays the saved pages and continues after them.
+        Yields status updates and data; returns the record count, or None if the search failed.
+        """
+        total = 0
+        where = (district_id, sro_id, year)
 
+        if state["step"] == "page":
+            for page_num, records in state["pages"]:
+                total += len(records)
+                yield {"status": "data", "year": year, "page": page_num, "count": len(records), "data": records, "resumed": True}
+            page_num = state["page"]
+            next_page_arg = state["next"]
+        else:
             # 5. Search - FULL PAGE POST (not AJAX!)
             yield {"status": "info", "message": f"Searching for '{name_pattern}'..."}
             
-            # Remove AJAX headers for full page post
-            s.headers.pop("X-Requested-With", None)
-            s.headers.pop("X-MicrosoftAjax", None)
-            s.headers["Content-Type"] = "application/x-www-form-urlencoded"
-            
-            search_payload = {
-                "__EVENTTARGET": "",
-                "__EVENTARGUMENT": "",
-                "__LASTFOCUS": "",
-                "__VIEWSTATE": vs.get("__VIEWSTATE", ""),
-                "__VIEWSTATEGENERATOR": vs.get("__VIEWSTATEGENERATOR", ""),
-                "__EVENTVALIDATION": vs.get("__EVENTVALIDATION", ""),
-                "ctl00$MainContent$ddl_dis": district_id,
-                "ctl00$MainContent$ddl_sro": sro_id,
-                "ctl00$MainContent$dd_regyear": year,
-                "propAddress": name_pattern,
-                "ctl00$MainContent$btn_prcd": "Search",
-            }
-            
             try:
-                r = s.post(self.base_url, data=search_payload, timeout=60)
-                soup = BeautifulSoup(r.content, "html.parser")
-                vs = self.get_hidden_fields(soup)
+                search_payload = self.build_search_payload(vs, district_id, sro_id, year, name_pattern)
+                started = time.monotonic()
+                r = yield from self._attempt("Search", s, "POST", data=search_payload, headers=self.form_headers)
+                parse_started = time.monotonic()
+                page = self.parse_page(r.content)
+                self._timing("search", where, started, parse_started, r, page.hidden_fields, 1)
             except Exception as e:
                 yield {"status": "error", "message": f"Search failed: {str(e)}"}
-                return
+                return None
 
-            # 6. Pagination Loop
             page_num = 1
-            while True:
-                # Parse current page
-                page_results = self.parse_table(soup)
-                count = len(page_results)
-                results.extend(page_results)
-                
-                yield {
-                    "status": "data", 
-                    "year": year, 
-                    "page": page_num, 
-                    "count": count, 
-                    "data": page_results
-                }
-
-                # Check for Next Page
-                time.sleep(2)
-                
-                next_page_arg = self.check_pagination(soup, page_num)
-                
-                if next_page_arg:
-                    yield {"status": "info", "message": f"Navigating to page {page_num + 1}..."}
-                    
-                    # Full page POST for pagination
-                    pagination_payload = {
-                        "__EVENTTARGET": "ctl00$MainContent$GridView2",
-                        "__EVENTARGUMENT": next_page_arg,
-                        "__LASTFOCUS": "",
-                        "__VIEWSTATE": vs.get("__VIEWSTATE", ""),
-                        "__VIEWSTATEGENERATOR": vs.get("__VIEWSTATEGENERATOR", ""),
-                        "__EVENTVALIDATION": vs.get("__EVENTVALIDATION", ""),
-                        "ctl00$MainContent$ddl_dis": district_id,
-                        "ctl00$MainContent$ddl_sro": sro_id,
-                        "ctl00$MainContent$dd_regyear": year,
-                        "propAddress": name_pattern,
-                    }
+            total += len(page.records)
+            next_page_arg = yield from self._emit_page(s, page, page_num, year, state, key)
+            if next_page_arg and self.page_workers > 1:
+                total += yield from self._fetch_pages(s, page, district_id, sro_id, year, name_pattern, state, key)
+                return total
+
+        # 6. Pagination Loop
+        while next_page_arg:
+            self._pause(where)
+            yield {"status": "info", "message": f"Navigating to page {page_num + 1}..."}
+            
+            # Full page POST for pagination
+            pagination_payload = self.build_pagination_payload(
+                state["vs"], next_page_arg, district_id, sro_id, year, name_pattern
+            )
+
+            try:
+                started = time.monotonic()
+                r = yield from self._attempt(
+                    "Pagination", s, "POST", data=pagination_payload, headers=self.form_headers
+                )
+                parse_started = time.monotonic()
+                page = self.parse_page(r.content)
+                self._timing("page", where, started, parse_started, r, page.hidden_fields, page_num + 1)
+            except Exception as e:
+                yield {"status": "error", "message": f"Pagination failed: {str(e)}"}
+                return total
+
+            page_num += 1
+            total += len(page.records)
+            next_page_arg = yield from self._emit_page(s, page, page_num, year, state, key)
+
+        state["complete"] = True
+        return total
+
+    def scrape_year(self, district_id, sro_id, year, name_pattern):
+        """
+        Generator that scrapes data for a single year.
+        Yields status updates and data as it progresses.
+        With a CheckpointStore, progress is saved after every step and results page;
+        a crawl that failed or was interrupted resumes from its last good step, unless the
+        resumed crawl fails before getting past it.
+        """
+        key = (self.search_type, district_id, sro_id, str(year), name_pattern)
+        state = self.checkpoints.load(key) if self.checkpoints is not None else None
+        resumed = state is not None
+        if state is None:
+            state = new_state()
+        resumed_at = (state["step"], state["page"])
+
+        # CRITICAL: Fresh session (cookies) per year; connections come from the shared pool
+        with self.transport.session(self.headers) as s:
+            s.cookies.update(state["cookies"])
+            
+            if resumed:
+                yield {"status": "info", "message": f"Resuming Year {year} from checkpoint ({state['step']})..."}
+            else:
+                yield {"status": "info", "message": f"Starting session for Year {year}..."}
+            
+            vs = yield from self._select_form(s, district_id, sro_id, year, state, key)
+            total = None
+            if vs is not None:
+                total = yield from self._search_pages(s, vs, district_id, sro_id, year, name_pattern, state, key)
 
+        # Drop the checkpoint of a finished crawl, and of a resumed one that got no step past it
+        # (e.g. its session or ViewState expired on the server), which would only fail again
+        stuck = resumed and (state["step"], state["page"]) == resumed_at
+        if self.checkpoints is not None and (state.get("complete") or stuck):
+            self.checkpoints.delete(key)
+        if total is None:
+            return
+        yield {"status": "done", "year": year, "total": total, "rate": self.throttle.rate()}
+
+    def scrape_names(self, district_id, sro_id, year, name_patterns):
+        """
+        Generator that searches several names within one district/SRO/year session.
+        The dropdown postbacks run once; every name is searched (and paginated) from a
+        snapshot of the resulting hidden fields, so N names cost 4 + N + pages requests.
+        Updates belonging to a name carry a "name" key; a name whose search fails is skipped.
+        """
+        with self.transport.session(self.headers) as s:
+
+            yield {"status": "info", "message": f"Starting session for Year {year}..."}
+
+            vs = yield from self._select_form(s, district_id, sro_id, year, new_state())
+            if vs is None:
+                return
+            snapshot = vs.copy()
+
+            for name_pattern in name_patterns:
+                pages = self._search_pages(s, snapshot.copy(), district_id, sro_id, year, name_pattern, new_state())
+                total = None
+                while True:
                     try:
-                        r = s.post(self.base_url, data=pagination_payload, timeout=60)
-                        soup = BeautifulSoup(r.content, "html.parser")
-                        vs = self.get_hidden_fields(soup)
-                        page_num += 1
-                    except Exception as e:
-                        yield {"status": "error", "message": f"Pagination failed: {str(e)}"}
+                        update = next(pages)
+                    except StopIteration as stop:
+                        total = stop.value
                         break
-                else:
+                    update["name"] = name_pattern
+                    yield update
+
+                if total is not None:
+                    yield {
+                        "status": "done", "year": year, "name": name_pattern,
+                        "total": total, "rate": self.throttle.rate(),
+                    }
+
+    def refresh_year(self, district_id, sro_id, year, name_pattern, known_ids, stop_after=2):
+        """
+        Generator re-crawling a year whose earlier results are known, emitting only new records.
+        known_ids: record_id()s (year + RegNo + RegDate) of the records seen before.
+        Pages are fetched one after another. Once `stop_after` consecutive pages hold nothing
+        new, pagination stops, provided the registration dates seen so far run newest first;
+        otherwise new registrations may still follow and every page is fetched.
+        The done update adds "pages" (pages fetched) and "caught_up" (stopped early).
+        """
+        where = (district_id, sro_id, year)
+        total = 0
+        page_num = 0
+        caught_up = False
+        with self.transport.session(self.headers) as s:
+            yield {"status": "info", "message": f"Refreshing Year {year}..."}
+
+            vs = yield from self._select_form(s, district_id, sro_id, year, new_state())
+            if vs is None:
+                return
+
+            yield {"status": "info", "message": f"Searching for '{name_pattern}'..."}
+            label = "Search"
+            payload = self.build_search_payload(vs, district_id, sro_id, year, name_pattern)
+            dates = []
+            seen_run = 0
+            while True:
+                try:
+                    started = time.monotonic()
+                    r = yield from self._attempt(label, s, "POST", data=payload, headers=self.form_headers)
+                    parse_started = time.monotonic()
+                    page = self.parse_page(r.content)
+                    self._timing("search" if label == "Search" else "page", where, started, parse_started,
+                                 r, page.hidden_fields, page_num + 1)
+                except Exception as e:
+                    yield {"status": "error", "message": f"{label} failed: {str(e)}"}
+                    return
+                page_num += 1
+
+                fresh = [rec for rec in page.records if record_id(year, rec) not in known_ids]
+                if fresh:
+                    total += len(fresh)
+                    yield {
+                        "status": "data", "year": year, "page": page_num, "count": len(fresh),
+                        "data": fresh, "rate": self.throttle.rate(),
+                    }
+                seen_run = 0 if fresh else seen_run + 1
+                dates.extend(d for d in (parse_date(rec.get("RegDate")) for rec in page.records) if d)
+
+                next_page_arg = page.next_page(page_num)
+                if not next_page_arg:
+                    break
+                if seen_run >= stop_after and all(a >= b for a, b in zip(dates, dates[1:])):
+                    caught_up = True
+                    yield {"status": "info", "message": f"Year {year}: no new records on the last {seen_run} pages, stopping at page {page_num}"}
                     break
 
-        yield {"status": "done", "year": year, "total": len(results)}
+                self._pause(where)
+                yield {"status": "info", "message": f"Navigating to page {page_num + 1}..."}
+                label = "Pagination"
+                payload = self.build_pagination_payload(
+                    page.hidden_fields, next_page_arg, district_id, sro_id, year, name_pattern
+                )
+
+        yield {
+            "status": "done", "year": year, "total": total, "pages": page_num,
+            "caught_up": caught_up, "rate": self.throttle.rate(),
+        }
+
+    def scrape_options(self, district_id):
+        """
+        Generator refreshing the catalog entries of one district: the initial GET, the
+        district postback (its SRO options), then one SRO postback per SRO (its year options),
+        all from the same post-district snapshot. Yields info/error updates and a final
+        {"status": "done", "sros": N}.
+        """
+        if self.catalog is None:
+            raise ValueError("scrape_options needs a catalog")
+        where = (district_id, "", "")
+        with self.transport.session(self.headers) as s:
+            yield {"status": "info", "message": f"Reading SROs of district {district_id}..."}
+            try:
+                r = yield from self._attempt("Initial load", s, "GET")
+                vs = self.page_hidden_fields(r.content)
+                self._pause(where)
+                payload = self.build_dropdown_payload(vs, "ddl_dis", district_id)
+                r = yield from self._attempt("District selection", s, "POST", data=payload, headers=self.ajax_headers)
+                self.merge_ajax_fields(vs, r.content)
+                self._observe_options("ddl_dis", district_id, "", r)
+            except Exception as e:
+                yield {"status": "error", "message": f"District {district_id} options failed: {str(e)}"}
+                return
+            snapshot = vs.copy()
+
+            sros = self.catalog.sros(district_id) or {}
+            for sro_id in sros:
+                self._pause(where)
+                yield {"status": "info", "message": f"Reading years of SRO {sro_id}..."}
+                try:
+                    payload = self.build_dropdown_payload(snapshot, "ddl_sro", district_id, sro_id)
+                    r = yield from self._attempt("SRO selection", s, "POST", data=payload, headers=self.ajax_headers)
+                    self._observe_options("ddl_sro", district_id, sro_id, r)
+                except Exception as e:
+                    yield {"status": "error", "message": f"SRO {sro_id} options failed: {str(e)}"}
+
+        yield {"status": "done", "sros": len(sros)}
 
 
 # Simple test
@@ -0,0 +1,166 @@
+"""
+N-gram Search Index
+Bigram + trigram postings over the Buyer, Seller and Village text of scraped
+results, used by the Highlight/filter controls.
+
+Text is NFKC-normalised and case-folded, so Devanagari and Latin names are
+matched the same way (a code point n-gram works for both scripts). Rows are
+indexed as pages arrive (MemoryPostings); once a block of rows is complete (a
+SegmentStore segment) its postings are written next to it as an Arrow IPC file
+of sorted "field + gram" keys and the row numbers holding them. Lookups
+memory-map that file and binary-search the keys. Either way a query intersects
+posting lists instead of scanning every row.
+"""
+
+import bisect
+import unicodedata
+from array import array
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+INDEXED_FIELDS = ("Buyer", "Seller", "Village")
+
+_SEP = "\x1f"  # between the field and the gram in a postings key
+
+
+def normalize(text):
+    """NFKC + casefold + collapsed whitespace (works for Devanagari and Latin)."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+def ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class _Lookup:
+    """Query over bigram + trigram postings; subclasses provide size, _get, _scan and _confirm."""
+
+    def lookup(self, fields, query):
+        """Sorted row numbers where any of `fields` contains the normalised `query`."""
+        if len(fields) == 1:
+            return self._lookup(fields[0], query)
+        hit = np.zeros(self.size, dtype=bool)
+        for field in fields:
+            hit[self._lookup(field, query)] = True
+        return np.flatnonzero(hit)
+
+    def _lookup(self, field, query):
+        empty = np.empty(0, dtype=np.int64)
+        if len(query) == 1:
+            return self._scan(field, query)
+        if len(query) <= 3:
+            rows = self._get(field, query)
+            return empty if rows is None else rows
+
+        postings = []
+        for gram in ngrams(query, 3):
+            rows = self._get(field, gram)
+            if rows is None:
+                return empty
+            postings.append(rows)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for rows in postings[1:]:
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                return empty
+        # Trigrams can match out of order: confirm the substring
+        return self._confirm(field, query, candidates)
+
+
+class MemoryPostings(_Lookup):
+    """Postings of rows as they are added (numbered from 0), searchable meanwhile."""
+
+    def __init__(self, fields=INDEXED_FIELDS):
+        self.size = 0
+        self.texts = {field: [] for field in fields}
+        self._postings = {}  # "field + gram" -> array of rows
+
+    def add(self, texts):
+        """Index rows given as normalised text per field: {"Buyer": [...], ...}."""
+        count = len(next(iter(texts.values()))) if texts else 0
+        for field, values in texts.items():
+            self.texts[field].extend(values)
+            for offset, text in enumerate(values):
+                row = self.size + offset
+                for n in (2, 3):
+                    for gram in ngrams(text, n):
+                        key = field + _SEP + gram
+                        rows = self._postings.get(key)
+                        if rows is None:
+                            rows = self._postings[key] = array("i")
+                        rows.append(row)
+        self.size += count
+
+    def matches(self, fields, query, start):
+        """Rows from `start` on where any of `fields` contains `query`, checked row by row."""
+        return np.array([
+            row for row in range(start, self.size)
+            if any(query in self.texts[field][row] for field in fields)
+        ], dtype=np.int64)
+
+    def _get(self, field, gram):
+        rows = self._postings.get(field + _SEP + gram)
+        return None if rows is None else np.array(rows, dtype=np.int64)
+
+    def _scan(self, field, query):
+        return np.array([row for row, text in enumerate(self.texts[field]) if query in text], dtype=np.int64)
+
+    def _confirm(self, field, query, candidates):
+        texts = self.texts[field]
+        return np.array([row for row in candidates if query in texts[row]], dtype=np.int64)
+
+    def write(self, path):
+        """Write the postings to `path` for Postings."""
+        keys = sorted(self._postings)
+        lengths = np.fromiter((len(self._postings[key]) for key in keys), dtype=np.int32, count=len(keys))
+        offsets = np.zeros(len(keys) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=offsets[1:])
+        values = np.frombuffer(b"".join(self._postings[key].tobytes() for key in keys), dtype=np.int32)
+        table = pa.table({
+            "key": pa.array(keys, pa.string()),
+            "rows": pa.ListArray.from_arrays(pa.array(offsets), pa.array(values)),
+        })
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+class _Keys:
+    """Sequence view of an Arrow string array for bisect."""
+
+    def __init__(self, array):
+        self._array = array
+
+    def __len__(self):
+        return len(self._array)
+
+    def __getitem__(self, i):
+        return self._array[i].as_py()
+
+
+class Postings(_Lookup):
+    """Memory-mapped postings written by MemoryPostings.write()."""
+
+    def __init__(self, path, texts):
+        """texts: the normalised text columns (Arrow) of the rows, read to confirm matches."""
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        self._keys = _Keys(table.column("key").combine_chunks())
+        self._rows = table.column("rows").combine_chunks()
+        self.texts = texts
+        self.size = len(next(iter(texts.values())))
+
+    def _get(self, field, gram):
+        key = field + _SEP + gram
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._rows[i].values.to_numpy(zero_copy_only=False).astype(np.int64)
+        return None
+
+    def _scan(self, field, query):
+        return np.flatnonzero(pc.match_substring(self.texts[field], query).to_numpy(zero_copy_only=False))
+
+    def _confirm(self, field, query, candidates):
+        mask = pc.match_substring(self.texts[field].take(pa.array(candidates)), query)
+        return candidates[mask.to_numpy(zero_copy_only=False)]
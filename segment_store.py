@@ -0,0 +1,239 @@
+"""
+Spill-to-Disk Result Store
+Append-only store of RecordBatches for result sets too large to keep in memory.
+Pages are buffered until `segment_rows` rows have arrived, then written out as
+one Arrow IPC segment file. Reads memory-map only the segments a request
+touches, so the UI pages through any number of records with bounded memory,
+and exports stream segment by segment to CSV or Parquet.
+
+Every segment also carries search_index.normalize()d copies of the Buyer,
+Seller and Village columns. The tail's n-gram postings are kept up to date as
+pages are appended and written next to the segment when it is flushed, so
+Highlight queries look up posting lists instead of scanning rows, whether the
+rows are on disk yet or not. Rows are identified by their position in
+insertion order.
+"""
+
+import bisect
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from records import SCHEMA, table_to_pandas
+from search_index import INDEXED_FIELDS, MemoryPostings, Postings, normalize
+
+NORM_PREFIX = "_norm_"
+
+
+class SegmentStore:
+    """Records on disk in Arrow IPC segments, plus an in-memory tail of at most `segment_rows` rows."""
+
+    def __init__(self, directory=None, segment_rows=10_000, cached_queries=16, open_segments=32):
+        """
+        directory: where segments are written; by default a temporary directory removed
+        with the store.
+        segment_rows: rows buffered in memory before they are written as a segment.
+        open_segments: segments whose postings are kept memory-mapped between queries.
+        """
+        self.directory = directory or tempfile.mkdtemp(prefix="propfind_results_")
+        os.makedirs(self.directory, exist_ok=True)
+        self.segment_rows = segment_rows
+        self.cached_queries = cached_queries
+        self.open_segments = open_segments
+        self.size = 0
+        self.generation = 0  # bumped by clear(): row ids of different generations are unrelated
+        self._segments = []  # (path, rows)
+        self._starts = []  # first row id of every segment
+        self._pending = []  # tables not written yet
+        self._pending_rows = 0
+        self._tail = MemoryPostings()  # postings of the pending rows
+        self._open = OrderedDict()  # segment path -> Postings, most recently used last
+        # (field, normalised query) -> (written rows looked up, their row id arrays,
+        #                               segment count when the tail was looked up, tail rows looked up, their row ids)
+        self._results = {}
+        self._lock = threading.Lock()
+        if directory is None:
+            weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+
+    def __len__(self):
+        return self.size
+
+    def append(self, batch):
+        """Add a records.RecordBatch (one results page)."""
+        if not len(batch):
+            return
+        table = batch.table
+        texts = {}
+        for field in INDEXED_FIELDS:
+            texts[field] = [normalize(value) for value in table.column(field).to_pylist()]
+            table = table.append_column(NORM_PREFIX + field, pa.array(texts[field], pa.string()))
+        with self._lock:
+            self._tail.add(texts)
+            self._pending.append(table)
+            self._pending_rows += len(table)
+            self.size += len(table)
+            if self._pending_rows >= self.segment_rows:
+                self._flush()
+
+    def flush(self):
+        """Write the in-memory tail as a segment."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        # The IPC file format needs one dictionary per column: unify before writing
+        table = pa.concat_tables(self._pending).unify_dictionaries().combine_chunks()
+        path = os.path.join(self.directory, f"segment-{len(self._segments):06d}.arrow")
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        self._tail.write(self._postings_path(path))
+        self._tail = MemoryPostings()
+        self._starts.append(self.size - self._pending_rows)
+        self._segments.append((path, len(table)))
+        self._pending = []
+        self._pending_rows = 0
+
+    @staticmethod
+    def _postings_path(path):
+        return path[:-len(".arrow")] + ".postings.arrow"
+
+    def clear(self):
+        """Drop every record (segment files included)."""
+        with self._lock:
+            for path, _ in self._segments:
+                for name in (path, self._postings_path(path)):
+                    try:
+                        os.remove(name)
+                    except OSError:
+                        pass
+            self._segments, self._starts, self._pending = [], [], []
+            self._pending_rows = 0
+            self._tail = MemoryPostings()
+            self._open.clear()
+            self.size = 0
+            self.generation += 1
+            self._results.clear()
+
+    def _spans(self, lo=0, hi=None):
+        """
+        (start row, row count, loader, written) of the segments overlapping rows [lo, hi),
+        then of the in-memory tail (written=False); loader() returns the part as an Arrow table.
+        """
+        with self._lock:
+            segments, starts, pending = list(self._segments), list(self._starts), list(self._pending)
+            tail_start = self.size - self._pending_rows
+            tail_rows = self._pending_rows
+        hi = tail_start + tail_rows if hi is None else hi
+        first = max(bisect.bisect_right(starts, lo) - 1, 0)
+        for i in range(first, len(segments)):
+            if starts[i] >= hi:
+                return
+            path, rows = segments[i]
+            if starts[i] + rows > lo:
+                yield starts[i], rows, lambda path=path: pa.ipc.open_file(pa.memory_map(path)).read_all(), True
+        if pending and tail_start < hi:
+            yield tail_start, tail_rows, lambda: pa.concat_tables(pending), False
+
+    def read(self, offset, limit, columns=None):
+        """Rows [offset, offset + limit) as an Arrow table (`columns` default: the records schema)."""
+        columns = columns or SCHEMA.names
+        end = min(offset + limit, self.size)
+        parts = []
+        for start, rows, load, _ in self._spans(offset, end):
+            lo = max(offset, start)
+            parts.append(load().select(columns).slice(lo - start, min(end, start + rows) - lo))
+        if not parts:
+            return SCHEMA.empty_table().select(columns)
+        return pa.concat_tables(parts)
+
+    def take(self, row_ids, columns=None):
+        """Rows with the given ids (ascending) as an Arrow table."""
+        columns = columns or SCHEMA.names
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        if not len(row_ids):
+            return SCHEMA.empty_table().select(columns)
+        parts = []
+        for start, rows, load, _ in self._spans(int(row_ids[0]), int(row_ids[-1]) + 1):
+            lo, hi = np.searchsorted(row_ids, [start, start + rows])
+            if hi > lo:
+                parts.append(load().select(columns).take(pa.array(row_ids[lo:hi] - start)))
+        return pa.concat_tables(parts)
+
+    def _postings(self, path):
+        """Postings of the segment at `path`, kept open for the next queries."""
+        postings = self._open.pop(path, None)
+        if postings is None:
+            table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+            texts = {field: table.column(NORM_PREFIX + field) for field in INDEXED_FIELDS}
+            postings = Postings(self._postings_path(path), texts)
+            while len(self._open) >= self.open_segments:
+                self._open.popitem(last=False)
+        self._open[path] = postings
+        return postings
+
+    def search(self, query, field="All"):
+        """
+        Sorted row ids (numpy array) whose `field` (or Buyer/Seller/Village for "All")
+        contains `query` once both are normalize()d. Each segment and the tail are looked
+        up in their postings once per query; repeated queries only look up segments
+        written since and check the rows appended to the tail since.
+        """
+        query = normalize(query)
+        if not query or (field != "All" and field not in INDEXED_FIELDS):
+            return np.empty(0, dtype=np.int64)
+        fields = INDEXED_FIELDS if field == "All" else (field,)
+
+        key = (field, query)
+        with self._lock:
+            scanned_rows, hits, tail_segment, tail_rows, tail_hits = self._results.pop(key, (0, [], -1, 0, None))
+            hits = list(hits)
+            first = bisect.bisect_left(self._starts, scanned_rows)
+            for (path, rows), start in zip(self._segments[first:], self._starts[first:]):
+                hits.append(self._postings(path).lookup(fields, query) + start)
+                scanned_rows = start + rows
+
+            if tail_segment == len(self._segments):  # same tail: check the rows appended since
+                tail_hits = np.concatenate([tail_hits, self._tail.matches(fields, query, tail_rows)])
+            else:
+                tail_hits = self._tail.lookup(fields, query)
+            tail_start = self.size - self._pending_rows
+
+            if len(self._results) >= self.cached_queries:
+                self._results.pop(next(iter(self._results)))
+            self._results[key] = (scanned_rows, hits, len(self._segments), self._tail.size, tail_hits)
+        return np.concatenate(hits + [tail_hits + tail_start])
+
+    def iter_tables(self, columns=None, chunk_rows=50_000):
+        """Every record in insertion order, as Arrow tables of at most `chunk_rows` rows."""
+        columns = columns or SCHEMA.names
+        for _, rows, load, _ in self._spans():
+            table = load().select(columns)
+            for offset in range(0, rows, chunk_rows):
+                yield table.slice(offset, chunk_rows)
+
+    def write_csv(self, f, columns=None, chunk_rows=50_000):
+        """Stream every record as UTF-8 CSV into the binary file `f`."""
+        columns = columns or SCHEMA.names
+        header = True
+        for table in self.iter_tables(columns, chunk_rows):
+            f.write(table_to_pandas(table).to_csv(index=False, header=header).encode("utf-8"))
+            header = False
+        if header:
+            f.write((",".join(columns) + "\n").encode("utf-8"))
+
+    def write_parquet(self, f, columns=None, chunk_rows=50_000):
+        """Stream every record into a Parquet file (path or binary file), one row group per chunk."""
+        columns = columns or SCHEMA.names
+        schema = pa.schema([SCHEMA.field(name) for name in columns])
+        with pq.ParquetWriter(f, schema) as writer:
+            for table in self.iter_tables(columns, chunk_rows):
+                writer.write_table(table)
@@ -0,0 +1,170 @@
+"""
+Single-Flight Searches
+Collapses identical concurrent crawls into one. The first caller of a
+(search_type, district, sro, year, name_pattern) key drives the real
+scrape_year crawl and records every update in a shared SQLite table; callers
+arriving while it runs (other threads, other job worker processes) replay
+the updates already recorded and then follow the live stream, so the portal
+sees a single crawl.
+
+If the leading crawl stops early (its consumer went away) or stops sending
+heartbeats, a follower takes the key over and continues, skipping the pages it
+has already passed on.
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    state TEXT NOT NULL,
+    heartbeat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS flight_events (
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (key, owner, seq)
+);
+"""
+
+
+class SingleFlight:
+    """SQLite-backed single-flight coordinator, shared by threads and processes using the same file."""
+
+    def __init__(self, path="propfind_jobs.sqlite3", poll_interval=0.25, stale_after=300.0, keep_for=600.0):
+        """
+        poll_interval: seconds between follower polls.
+        stale_after: a running flight without updates for this long is taken over.
+        keep_for: seconds finished flights stay replayable before they are purged.
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.keep_for = keep_for
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _claim(self, key):
+        """Become the leader of `key` unless a live flight exists; returns (owner, leading)."""
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            self._purge(db, now)
+            row = db.execute("SELECT owner, state, heartbeat FROM flights WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] == "running" and now - row[2] <= self.stale_after:
+                db.execute("COMMIT")
+                return row[0], False
+            owner = uuid.uuid4().hex
+            if row is not None:
+                db.execute("DELETE FROM flight_events WHERE key = ?", (key,))
+            db.execute("INSERT OR REPLACE INTO flights VALUES (?, ?, 'running', ?)", (key, owner, now))
+            db.execute("COMMIT")
+            return owner, True
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def _purge(self, db, now):
+        expired = [row[0] for row in db.execute(
+            "SELECT key FROM flights WHERE state != 'running' AND heartbeat < ?", (now - self.keep_for,)
+        )]
+        for key in expired:
+            db.execute("DELETE FROM flights WHERE key = ?", (key,))
+            db.execute("DELETE FROM flight_events WHERE key = ?", (key,))
+
+    def run(self, key, factory):
+        """
+        Generator yielding the updates of the crawl for `key`.
+        factory() starts the real crawl; it is only called when no identical crawl is running.
+        Updates relayed from another caller's crawl carry "shared": True.
+        """
+        key = json.dumps(list(key), ensure_ascii=False)
+        seen_pages = set()
+        while True:
+            owner, leading = self._claim(key)
+            if leading:
+                yield from self._lead(key, owner, factory, seen_pages)
+                return
+            finished = yield from self._follow(key, owner, seen_pages)
+            if finished:
+                return
+
+    def _lead(self, key, owner, factory, seen_pages):
+        seq = 0
+        state = "abandoned"
+        db = self._connect()
+        try:
+            for update in factory():
+                seq += 1
+                db.execute("INSERT INTO flight_events VALUES (?, ?, ?, ?)",
+                           (key, owner, seq, json.dumps(update, ensure_ascii=False)))
+                db.execute("UPDATE flights SET heartbeat = ? WHERE key = ? AND owner = ?", (time.time(), key, owner))
+                if update["status"] == "data":
+                    if update.get("page") in seen_pages:
+                        continue
+                    seen_pages.add(update.get("page"))
+                yield update
+            state = "done"
+        finally:
+            db.execute("UPDATE flights SET state = ?, heartbeat = ? WHERE key = ? AND owner = ?",
+                       (state, time.time(), key, owner))
+            db.close()
+
+    def _follow(self, key, owner, seen_pages):
+        """Relay `owner`'s updates; returns True when its crawl finished, False to take over."""
+        seq = 0
+        db = self._connect()
+        try:
+            while True:
+                row = db.execute("SELECT owner, state, heartbeat FROM flights WHERE key = ?", (key,)).fetchone()
+                rows = db.execute(
+                    "SELECT seq, event FROM flight_events WHERE key = ? AND owner = ? AND seq > ? ORDER BY seq",
+                    (key, owner, seq),
+                ).fetchall()
+                for seq, event in rows:
+                    update = json.loads(event)
+                    if update["status"] == "data":
+                        if update.get("page") in seen_pages:
+                            continue
+                        seen_pages.add(update.get("page"))
+                    update["shared"] = True
+                    yield update
+                if row is None or row[0] != owner:
+                    return False
+                if rows:
+                    continue
+                if row[1] == "done":
+                    return True
+                if row[1] != "running" or time.time() - row[2] > self.stale_after:
+                    return False
+                time.sleep(self.poll_interval)
+        finally:
+            db.close()
+
+
+class SingleFlightScraper:
+    """scrape_year front end that joins an identical crawl already in progress instead of starting one."""
+
+    def __init__(self, scraper, flights):
+        self.scraper = scraper
+        self.flights = flights
+        self.search_type = scraper.search_type
+
+    def scrape_year(self, district_id, sro_id, year, name_pattern):
+        """Same contract as PropertyScraperCore.scrape_year."""
+        key = (self.search_type, district_id, sro_id, str(year), name_pattern)
+        return self.flights.run(key, lambda: self.scraper.scrape_year(district_id, sro_id, year, name_pattern))
@@ -0,0 +1,309 @@
+"""
+District Sweep
+Searches one name in every SRO x year of one or more districts as a single crawl.
+Work items (one per SRO and year) are dealt to per-worker queues round-robin
+by SRO, so every SRO is under way from the start. A worker whose own queue
+runs dry steals from the back of the fullest other queue, so one huge SRO
+cannot leave the rest waiting behind it. The results of all items merge into
+one stream, de-duplicated across the sweep, with per-SRO progress and ETAs.
+
+Usage:
+    python sweep.py "राम" --district 12 --years 2019-2026 -o sweep.csv
+    python sweep.py "Ram" --district all --years 2026 -o sweep.parquet --workers 6 --catalog propfind_catalog.json
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from itertools import zip_longest
+
+from batch_runner import expand_codes, open_sink, parse_years
+from catalog import Catalog
+from districts import DISTRICTS, SRO_BY_DISTRICT
+from page_parser import record_id
+from result_cache import ResultCache
+from scrape_engine import ParallelScraper, RateLimiter
+
+# District / SRO code meaning "every one" in job parameters and the UI
+ALL = "*"
+
+_STARTED = object()
+_ENDED = object()
+_FINISHED = object()
+
+
+def sweep_items(district_ids, years, catalog=None):
+    """
+    (items, skipped): the (district, sro, year) work items of every SRO of `district_ids`,
+    interleaved by SRO (every SRO's first year, then every SRO's second year, ...), and
+    the items the catalog rules out.
+    """
+    by_sro, skipped = [], []
+    for district_id in district_ids:
+        known = catalog.sros(district_id) if catalog is not None else None
+        for sro_id in known or SRO_BY_DISTRICT.get(district_id, {}):
+            available = list(years)
+            if catalog is not None:
+                available, ruled_out = catalog.prune(district_id, sro_id, years)
+                skipped.extend((district_id, sro_id, year) for year in ruled_out)
+            by_sro.append([(district_id, sro_id, year) for year in available])
+    items = [item for round_ in zip_longest(*by_sro) for item in round_ if item is not None]
+    return items, skipped
+
+
+class WorkQueue:
+    """Work items dealt round-robin to per-worker deques, with stealing when a worker runs dry."""
+
+    def __init__(self, items, workers):
+        self.workers = max(1, workers)
+        self._deques = [deque() for _ in range(self.workers)]
+        for i, item in enumerate(items):
+            self._deques[i % self.workers].append(item)
+        self._lock = threading.Lock()
+        self.stolen = 0
+
+    def next(self, worker):
+        """The front of `worker`'s own deque, else the back of the fullest other one; None when all are empty."""
+        with self._lock:
+            own = self._deques[worker]
+            if own:
+                return own.popleft()
+            victim = max(self._deques, key=len)
+            if not victim:
+                return None
+            self.stolen += 1
+            return victim.pop()
+
+
+class SweepProgress:
+    """Per-SRO item and record counts of a sweep, with ETAs from each SRO's completion rate."""
+
+    def __init__(self, items):
+        self.started = time.monotonic()
+        self.done = 0
+        self.records = 0
+        self.sros = {}
+        for district_id, sro_id, _ in items:
+            entry = self.sros.setdefault((district_id, sro_id), {
+                "district": district_id, "sro": sro_id,
+                "name": SRO_BY_DISTRICT.get(district_id, {}).get(sro_id, sro_id),
+                "items": 0, "done": 0, "running": 0, "records": 0, "errors": 0, "started": None,
+            })
+            entry["items"] += 1
+        self.items = len(items)
+
+    def start(self, item):
+        entry = self.sros[item[:2]]
+        entry["running"] += 1
+        if entry["started"] is None:
+            entry["started"] = time.monotonic()
+
+    def finish(self, item):
+        entry = self.sros[item[:2]]
+        entry["running"] -= 1
+        entry["done"] += 1
+        self.done += 1
+
+    def add(self, item, records=0, errors=0):
+        entry = self.sros[item[:2]]
+        entry["records"] += records
+        entry["errors"] += errors
+        self.records += records
+
+    @staticmethod
+    def _eta(done, total, since, now):
+        """Seconds left at the rate items have completed since `since` (None before the first one)."""
+        if done >= total:
+            return 0.0
+        if not done or since is None:
+            return None
+        return (total - done) * (now - since) / done
+
+    def snapshot(self):
+        """JSON-ready {"status": "progress"} update: totals, overall ETA and one row per SRO."""
+        now = time.monotonic()
+        sros = []
+        for entry in self.sros.values():
+            row = {key: value for key, value in entry.items() if key != "started"}
+            row["eta"] = self._eta(entry["done"], entry["items"], entry["started"], now)
+            sros.append(row)
+        return {
+            "status": "progress", "items": self.items, "done": self.done, "records": self.records,
+            "elapsed": now - self.started, "eta": self._eta(self.done, self.items, self.started, now),
+            "sros": sros,
+        }
+
+
+class Sweep:
+    """Runs the SRO x year items of a district sweep on the engine's workers as one update stream."""
+
+    def __init__(self, engine, workers=None):
+        """engine: ParallelScraper whose cache, rate limit, catalog etc. every item goes through."""
+        self.engine = engine
+        self.workers = workers or engine.max_workers
+        self.stolen = 0
+
+    def _work(self, worker, work, name_pattern, events, stop):
+        """Worker body: crawl items from `work` until it is empty, forwarding their updates."""
+        try:
+            while not stop.is_set():
+                item = work.next(worker)
+                if item is None:
+                    return
+                district_id, sro_id, year = item
+                events.put((_STARTED, item))
+                try:
+                    for update in self.engine.year_stream(district_id, sro_id, year, name_pattern):
+                        if stop.is_set():
+                            return
+                        update.update(district=district_id, sro=sro_id, year=year)
+                        events.put(update)
+                except Exception as e:
+                    events.put({"status": "error", "district": district_id, "sro": sro_id, "year": year,
+                                "message": f"Worker failed: {str(e)}"})
+                events.put((_ENDED, item))
+        finally:
+            events.put(_FINISHED)
+
+    def run(self, district_ids, years, name_pattern, progress_every=2.0):
+        """
+        Generator sweeping every SRO of `district_ids` over `years` for `name_pattern`.
+        Yields scrape_year updates tagged with "district", "sro" and "year"; "data" updates
+        only carry records not already yielded by the sweep. A {"status": "progress"} update
+        (SweepProgress.snapshot) follows every finished item, and at most every
+        `progress_every` seconds while records arrive.
+        """
+        items, skipped = sweep_items(district_ids, years, self.engine.catalog)
+        if skipped:
+            yield {"status": "info", "message": f"{len(skipped)} SRO/years not offered by the portal, skipped"}
+        progress = SweepProgress(items)
+        yield progress.snapshot()
+        if not items:
+            return
+
+        work = WorkQueue(items, min(self.workers, len(items)))
+        events = queue.Queue()
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=self._work, args=(i, work, name_pattern, events, stop), daemon=True)
+            for i in range(work.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        seen = set()
+        remaining = len(threads)
+        last_report = time.monotonic()
+        try:
+            while remaining:
+                event = events.get()
+                if event is _FINISHED:
+                    remaining -= 1
+                    continue
+                if isinstance(event, tuple):
+                    marker, item = event
+                    if marker is _STARTED:
+                        progress.start(item)
+                    else:
+                        progress.finish(item)
+                        last_report = time.monotonic()
+                        yield progress.snapshot()
+                    continue
+
+                item = (event["district"], event["sro"], event["year"])
+                if event["status"] == "data":
+                    fresh = []
+                    for rec in event["data"]:
+                        key = record_id(event["year"], rec, event["district"], event["sro"])
+                        if key not in seen:
+                            seen.add(key)
+                            fresh.append(rec)
+                    progress.add(item, records=len(fresh))
+                    if not fresh:
+                        continue
+                    event["data"], event["count"] = fresh, len(fresh)
+                elif event["status"] == "error":
+                    progress.add(item, errors=1)
+                yield event
+                if time.monotonic() - last_report >= progress_every:
+                    last_report = time.monotonic()
+                    yield progress.snapshot()
+        finally:
+            stop.set()
+            self.stolen = work.stolen
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m" if seconds >= 3600 else f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("name", help="buyer/seller name to search")
+    parser.add_argument("-o", "--output", required=True, help="output file (.csv or .parquet)")
+    parser.add_argument("--type", choices=["buyer", "seller"], default="buyer", help="search type")
+    parser.add_argument("--district", required=True, help="district code(s), comma separated or 'all'")
+    parser.add_argument("--years", required=True, help="years, e.g. 2019 or 2015-2020")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent portal sessions")
+    parser.add_argument("--page-workers", type=int, default=1,
+                        help="results pages of one search fetched concurrently")
+    parser.add_argument("--rate", type=float, default=0.5, help="minimum seconds between requests to the portal")
+    parser.add_argument("--cache", help="ResultCache SQLite file to reuse and fill")
+    parser.add_argument("--catalog", help="availability catalog JSON (see catalog.py) used to skip empty SRO/years")
+    parser.add_argument("--progress", type=float, default=10.0, help="seconds between progress reports")
+    args = parser.parse_args(argv)
+
+    engine = ParallelScraper(
+        search_type=args.type, max_workers=args.workers, rate_limiter=RateLimiter(args.rate),
+        cache=ResultCache(args.cache) if args.cache else None, page_workers=args.page_workers,
+        catalog=Catalog(args.catalog) if args.catalog else None,
+    )
+    sweep = Sweep(engine)
+    districts = expand_codes(args.district, DISTRICTS)
+    failures = []
+    written = 0
+    progress = None
+    sink = open_sink(args.output)
+    try:
+        for update in sweep.run(districts, parse_years(args.years), args.name, args.progress):
+            status = update["status"]
+            if status == "data":
+                rows = [dict(rec, Year=update["year"], Query=args.name, DistrictId=update["district"], SroId=update["sro"],
+                             _id=record_id(update["year"], rec, update["district"], update["sro"]))
+                        for rec in update["data"]]
+                sink.write(rows)
+                written += len(rows)
+            elif status == "error":
+                failures.append(f"{update['district']}/{update['sro']}/{update['year']}: {update['message']}")
+            elif status == "progress":
+                report = progress is None or update["done"] == update["items"] or \
+                    update["elapsed"] - progress["elapsed"] >= args.progress
+                if report:
+                    progress = update
+                    print(f"[{update['elapsed']:7.1f}s] items {update['done']}/{update['items']} | "
+                          f"records {update['records']} | ETA {format_eta(update['eta'])}", file=sys.stderr)
+                    for sro in update["sros"]:
+                        print(f"    {sro['district']}/{sro['sro']} {sro['name']}: {sro['done']}/{sro['items']} "
+                              f"({sro['running']} running) {sro['records']} records, ETA {format_eta(sro['eta'])}",
+                              file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        print("interrupted, partial results kept", file=sys.stderr)
+    finally:
+        sink.close()
+
+    print(f"{sweep.stolen} items stolen between workers", file=sys.stderr)
+    for failure in failures:
+        print(f"  FAILED {failure}", file=sys.stderr)
+    print(f"wrote {written} records to {os.path.abspath(args.output)}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
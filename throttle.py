@@ -0,0 +1,86 @@
+"""
+Request Throttling
+Pluggable controllers that decide how long the scraper pauses between requests.
+FixedThrottle reproduces the old time.sleep(2) behaviour; AdaptiveThrottle sets
+the delay from observed latency, HTTP status and timeouts.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class FixedThrottle:
+    """Constant delay between requests (the original behaviour)."""
+
+    def __init__(self, delay=2.0, window=60.0):
+        self.delay = delay
+        self.window = window
+        self._sent = deque()
+        self._lock = threading.Lock()
+
+    def record(self, latency, status=None, error=False, retry_after=None):
+        """Register a finished request (latency in seconds, HTTP status or error flag)."""
+        now = time.monotonic()
+        with self._lock:
+            self._sent.append(now)
+            while self._sent and now - self._sent[0] > self.window:
+                self._sent.popleft()
+
+    def next_delay(self):
+        """Seconds to pause before the next request."""
+        return self.delay
+
+    def wait(self):
+        """Sleep for next_delay() seconds."""
+        time.sleep(self.next_delay())
+
+    def rate(self):
+        """Effective request rate (requests/sec) over the recent window."""
+        now = time.monotonic()
+        with self._lock:
+            while self._sent and now - self._sent[0] > self.window:
+                self._sent.popleft()
+            if len(self._sent) < 2:
+                return 0.0
+            span = max(now - self._sent[0], 1.0)
+            return round(len(self._sent) / span, 3)
+
+
+class AdaptiveThrottle(FixedThrottle):
+    """
+    Latency/health driven delay.
+    - Healthy responses pull the delay down towards latency * latency_factor (never below min_delay).
+    - 429/5xx responses and timeouts/errors multiply the delay by `backoff` (never above max_delay).
+    - A Retry-After hint on a 429/503 is honoured as a lower bound.
+    """
+
+    def __init__(self, min_delay=0.25, max_delay=30.0, initial_delay=2.0,
+                 latency_factor=1.0, backoff=2.0, recovery=0.8, window=60.0):
+        super().__init__(delay=initial_delay, window=window)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.latency_factor = latency_factor
+        self.backoff = backoff
+        self.recovery = recovery
+
+    def record(self, latency, status=None, error=False, retry_after=None):
+        super().record(latency, status, error, retry_after)
+        with self._lock:
+            if error or status == 429 or (status is not None and status >= 500):
+                delay = max(self.delay, self.min_delay) * self.backoff
+                if retry_after:
+                    delay = max(delay, retry_after)
+            else:
+                target = latency * self.latency_factor
+                delay = max(target, self.delay * self.recovery)
+            self.delay = min(self.max_delay, max(self.min_delay, delay))
+
+
+def retry_after_seconds(headers):
+    """Parse a numeric Retry-After header (seconds); None when absent or not numeric."""
+    value = headers.get("Retry-After") if headers else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
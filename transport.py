@@ -0,0 +1,72 @@
+"""
+HTTP Transport
+Shared connection pool for PropertyScraperCore crawls.
+Every crawl still gets its own requests.Session, so ASP.NET session cookies
+stay isolated per crawl, but all sessions are mounted on one HTTPAdapter:
+keep-alive connections (and their TLS handshakes) are reused across years,
+SROs and names. Responses are negotiated compressed (gzip/deflate, plus br or
+zstd when the decoders are installed), and timeouts and connection-level
+retries are configured in one place.
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+
+class CrawlSession(requests.Session):
+    """Per-crawl session (own cookie jar) whose close() leaves the shared pool open."""
+
+    def close(self):
+        pass
+
+
+class Transport:
+    """Keep-alive pool shared by many crawls; session() hands out cookie-isolated sessions."""
+
+    def __init__(self, pool_connections=4, pool_maxsize=16, timeout=(10, 60), connect_retries=2,
+                 backoff=0.5, headers=None):
+        """
+        pool_maxsize: connections kept per host; size it to concurrent requests (year workers x page workers).
+        timeout: (connect, read) seconds applied to requests that do not pass their own.
+        connect_retries: transparent retries of failed connects (the request never reached the portal);
+        step-level retries of errors and 429/5xx stay in PropertyScraperCore.
+        headers: default headers of every session.
+        """
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        # Every encoding urllib3 can decode here (br/zstd only when brotli/zstandard are installed)
+        self.headers.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+        retry = Retry(total=connect_retries, connect=connect_retries, read=0, redirect=5, status=0,
+                      backoff_factor=backoff, allowed_methods=None, raise_on_status=False)
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    def session(self, headers=None):
+        """New cookie-isolated session over the shared pool."""
+        s = CrawlSession()
+        s.mount("https://", self.adapter)
+        s.mount("http://", self.adapter)
+        s.headers.update(self.headers)
+        if headers:
+            s.headers.update(headers)
+        return s
+
+    def close(self):
+        """Close the pooled connections."""
+        self.adapter.close()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_transport():
+    """Process-wide Transport used by scrapers that are not given one."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Transport()
+        return _default